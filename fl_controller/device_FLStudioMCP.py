@@ -16,10 +16,21 @@ Communication flow:
 4. Script reads command JSON, executes FL Studio API
 5. Script writes response to mcp_response.json
 6. MCP server reads response
+
+When the mmap module is available, the script also maps mcp_shm.bin and the MCP
+server exchanges commands through it instead of the JSON files. Layout:
+- offset 0: b"FMCP" magic (present while this script is loaded)
+- offset 64: command slot   [u32 seq][u32 length][payload]
+- offset 128K: response slot [u32 seq][u32 length][payload]
+A command is new when its seq differs from the last one handled; the response
+is written payload first and seq last, with seq equal to the command's. A length
+of 0xFFFFFFFF means the response didn't fit and was written to mcp_response.json.
 """
 
 import json
 import os
+import re
+import struct
 import sys
 import time
 from pathlib import Path
@@ -33,55 +44,155 @@ import plugins
 import transport
 import ui
 
+try:
+    import mmap
+except ImportError:
+    mmap = None
 
-def _get_script_dir() -> Path:
-    """Get the script directory path.
+# Use orjson when FL Studio's Python has it; it reads and writes bytes directly.
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so error handling is shared.
+try:
+    import orjson
+
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
 
-    FL Studio's Python environment doesn't support __file__, so we construct
-    the path based on the platform's standard FL Studio settings location.
-    """
-    if sys.platform == "darwin":
-        # macOS
-        base = Path.home() / "Documents" / "Image-Line" / "FL Studio" / "Settings"
-    elif sys.platform == "win32":
-        # Windows
-        base = Path(os.environ.get("USERPROFILE", "~")) / "Documents" / "Image-Line" / "FL Studio" / "Settings"
-    else:
-        # Linux (unlikely but handle it)
-        base = Path.home() / "Documents" / "Image-Line" / "FL Studio" / "Settings"
 
-    return base / "Hardware" / "FLStudioMCP"
+# Script directory. FL Studio's Python environment doesn't support __file__, so
+# the path is built from the platform's standard FL Studio settings location.
+if sys.platform == "win32":
+    _HOME_STR = os.environ.get("USERPROFILE", os.path.expanduser("~"))
+else:
+    _HOME_STR = os.path.expanduser("~")
 
+_SCRIPT_DIR_STR = os.path.join(
+    _HOME_STR, "Documents", "Image-Line", "FL Studio", "Settings", "Hardware", "FLStudioMCP"
+)
 
-# File paths for JSON communication
-SCRIPT_DIR = _get_script_dir()
+# File paths for JSON communication (Path objects kept for display/external use)
+SCRIPT_DIR = Path(_SCRIPT_DIR_STR)
 COMMAND_FILE = SCRIPT_DIR / "mcp_command.json"
 RESPONSE_FILE = SCRIPT_DIR / "mcp_response.json"
 
+# Plain string paths for the per-command open() calls
+_COMMAND_PATH_STR = os.path.join(_SCRIPT_DIR_STR, "mcp_command.json")
+_RESPONSE_PATH_STR = os.path.join(_SCRIPT_DIR_STR, "mcp_response.json")
+
+# Shared memory command/response channel (must match the MCP server's layout)
+_SHM_PATH_STR = os.path.join(_SCRIPT_DIR_STR, "mcp_shm.bin")
+_SHM_MAGIC = b"FMCP"
+_SHM_SIZE = 1 << 18
+_SHM_CMD_OFFSET = 64
+_SHM_RESP_OFFSET = 1 << 17
+_SHM_SLOT_HEADER = struct.Struct("<II")  # seq, length
+_SHM_RESP_CAPACITY = _SHM_SIZE - _SHM_RESP_OFFSET - _SHM_SLOT_HEADER.size
+_SHM_OVERFLOW = 0xFFFFFFFF
+
+_shm = None
+_last_shm_seq = 0
+
 # MIDI trigger note
 TRIGGER_NOTE = 127
 
+# Default names for unnamed insert tracks, prebuilt for the track listing
+_INSERT_NAMES = tuple(f"Insert {i}" for i in range(256))
+
+# Mute/solo "state" param (0 = off, 1 = on, 2 = toggle) -> FL Studio value arg
+_TRI_STATE_TOGGLE = 2
+_TRI_STATE_VALUES = (0, 1, -1)
+
+# Finds the command's action without a full parse (the MCP server writes "action"
+# first, after the request id of file commands)
+_ACTION_RE = re.compile(rb'"action"\s*:\s*"([^"\\]+)"')
+
+# Request id the MCP server puts at the start of file commands; echoed in the
+# response so the server can tell it from a late reply to an earlier command
+_REQUEST_ID_RE = re.compile(rb'\{"id":(\d+),')
+
+# Id of the last file command run. The command file is rewritten in place and
+# never removed, so a late or repeated trigger would otherwise run it again.
+_last_file_request_id = None
+
 
 def OnInit():
     """Called when the script is loaded."""
+    global _shm, _last_shm_seq
+    _shm = _open_shared_memory()
+    if _shm is not None:
+        # Don't replay a command left in the slot from a previous session
+        _last_shm_seq = _SHM_SLOT_HEADER.unpack_from(_shm, _SHM_CMD_OFFSET)[0]
+
     print("FL Studio MCP Controller initialized")
     print(f"Command file: {COMMAND_FILE}")
     print(f"Response file: {RESPONSE_FILE}")
+    if _shm is not None:
+        print(f"Shared memory: {_SHM_PATH_STR}")
 
 
 def OnDeInit():
     """Called when the script is unloaded."""
+    global _shm
+    if _shm is not None:
+        # Clear the magic so the MCP server falls back to the JSON files
+        _shm[0:4] = b"\0\0\0\0"
+        _shm.close()
+        _shm = None
     print("FL Studio MCP Controller deinitialized")
 
 
+def _open_shared_memory():
+    """Map the shared memory file, creating it if needed. Returns None if unavailable."""
+    if mmap is None:
+        return None
+
+    try:
+        os.makedirs(_SCRIPT_DIR_STR, exist_ok=True)
+        fd = os.open(_SHM_PATH_STR, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < _SHM_SIZE:
+                os.ftruncate(fd, _SHM_SIZE)
+            shm = mmap.mmap(fd, _SHM_SIZE)
+        finally:
+            os.close(fd)
+    except Exception as e:
+        print(f"Shared memory unavailable, using JSON files: {e}")
+        return None
+
+    shm[0:4] = _SHM_MAGIC
+    return shm
+
+
+def _pending_shm_seq():
+    """Return the seq of an unhandled shared memory command, or None."""
+    global _last_shm_seq
+    if _shm is None:
+        return None
+    seq = _SHM_SLOT_HEADER.unpack_from(_shm, _SHM_CMD_OFFSET)[0]
+    if seq == _last_shm_seq:
+        return None
+    _last_shm_seq = seq
+    return seq
+
+
 def OnMidiMsg(event):
     """Called when a MIDI message is received."""
-    # Check for trigger note (Note On, note 127)
-    if event.midiId == 0x90 and event.data1 == TRIGGER_NOTE and event.data2 > 0:
+    # Check for trigger note (Note On, note 127). The note number is tested
+    # first since it rejects almost every other event on its own.
+    if event.data1 == TRIGGER_NOTE and event.midiId == 0x90 and event.data2 > 0:
         execute_pending_command()
         event.handled = True
 
 
+def OnRefresh(flags):
+    """Called when something in the project changed; drop cached counts."""
+    _count_cache.clear()
+
+
 def OnIdle():
     """Called periodically when FL Studio is idle."""
     # Could be used for polling if needed
@@ -89,151 +200,155 @@ def OnIdle():
 
 
 def execute_pending_command():
-    """Read command from JSON file, execute it, and write response."""
-    response = {"success": False, "error": None}
+    """Read the pending command, execute it, and write the response."""
+    global _last_file_request_id
+    shm_seq = _pending_shm_seq()
+    request_id = None
 
     try:
-        # Read command file
-        if not COMMAND_FILE.exists():
-            response["error"] = "No command file found"
-            write_response(response)
+        try:
+            data = _read_command(shm_seq)
+        except FileNotFoundError:
+            write_response(_error_response("No command file found"), shm_seq)
             return
 
-        command_text = COMMAND_FILE.read_text()
-        command = json.loads(command_text)
+        if shm_seq is None:
+            match = _REQUEST_ID_RE.match(data)
+            if match:
+                request_id = int(match.group(1))
+                if request_id == _last_file_request_id:
+                    return
+                _last_file_request_id = request_id
+
+        # Commands that take no parameters skip the JSON parse and the generic
+        # dispatch entirely and call their handler directly
+        action = _peek_action(data)
+        handler = _NO_PARAM_DISPATCH.get(action)
+        if handler is not None:
+            response = handler()
+            static = _STATIC_RESPONSES.get(action)
+            if static is not None:
+                write_response_bytes(static, shm_seq, request_id)
+                return
+        else:
+            command = _loads(data)
+            action = sys.intern(command.get("action", ""))
+            response = dispatch_command(action, command.get("params", {}))
+
+        # Handlers return fresh dicts, so mark success in place (unknown
+        # actions come back already marked as failed)
+        response.setdefault("success", True)
 
-        action = command.get("action", "")
-        params = command.get("params", {})
+    except json.JSONDecodeError as e:
+        response = _error_response(f"Invalid JSON in command file: {e}")
+    except Exception as e:
+        response = _error_response(f"Error executing command: {e}")
 
-        # Execute command and get result
-        result = dispatch_command(action, params)
-        response = {"success": True, **result}
+    write_response(response, shm_seq, request_id)
 
-    except json.JSONDecodeError as e:
-        response["error"] = f"Invalid JSON in command file: {e}"
+
+def _read_command(shm_seq) -> bytes:
+    """Read raw command bytes from shared memory (if shm_seq is set) or the command file."""
+    if shm_seq is not None:
+        start = _SHM_CMD_OFFSET + _SHM_SLOT_HEADER.size
+        length = _SHM_SLOT_HEADER.unpack_from(_shm, _SHM_CMD_OFFSET)[1]
+        return _shm[start:start + length]
+
+    # json.loads accepts the raw bytes
+    with open(_COMMAND_PATH_STR, "rb") as f:
+        return f.read()
+
+
+_ERROR_TEMPLATE = {"success": False, "error": None}
+
+
+def _error_response(error: str) -> dict:
+    """Build a failed response carrying the given error message."""
+    response = dict(_ERROR_TEMPLATE)
+    response["error"] = error
+    return response
+
+
+# Short-lived cache for counts that rarely change between back-to-back commands
+_COUNT_CACHE_TTL = 0.05  # seconds
+_count_cache = {}
+
+
+def _cached_count(key, fn, *args) -> int:
+    """Return fn(*args), reusing a result cached under key for _COUNT_CACHE_TTL."""
+    now = time.monotonic()
+    entry = _count_cache.get(key)
+    if entry is not None and now - entry[0] < _COUNT_CACHE_TTL:
+        return entry[1]
+    value = fn(*args)
+    _count_cache[key] = (now, value)
+    return value
+
+
+def _peek_action(data: bytes) -> str:
+    """Extract the (interned) action name from raw command bytes, or "" if not found."""
+    match = _ACTION_RE.search(data)
+    return sys.intern(match.group(1).decode()) if match else ""
+
+
+def write_response(response: dict, shm_seq=None, request_id=None):
+    """Write response to shared memory (for shared memory commands) or the JSON file."""
+    try:
+        data = _dumps(response)
     except Exception as e:
-        response["error"] = f"Error executing command: {e}"
+        # Still answer, so the server reports the failure instead of timing out
+        print(f"Error encoding response: {e}")
+        data = _dumps(_error_response(f"Error encoding response: {e}"))
+    write_response_bytes(data, shm_seq, request_id)
 
-    write_response(response)
 
+def write_response_bytes(data: bytes, shm_seq=None, request_id=None):
+    """Write an encoded response to shared memory or the JSON file.
 
-def write_response(response: dict):
-    """Write response to JSON file."""
+    request_id, if set, is added as the response's leading "id" field.
+    """
     try:
-        RESPONSE_FILE.write_text(json.dumps(response, indent=2))
+        if shm_seq is not None and len(data) <= _SHM_RESP_CAPACITY:
+            start = _SHM_RESP_OFFSET + _SHM_SLOT_HEADER.size
+            _shm[start:start + len(data)] = data
+            length = len(data)
+        else:
+            if request_id is not None:
+                data = b'{"id":%d,' % request_id + data[1:]
+            with open(_RESPONSE_PATH_STR, "wb") as f:
+                f.write(data)
+            length = _SHM_OVERFLOW
+
+        if shm_seq is not None:
+            # Length first, seq last: the seq is what the MCP server waits on
+            struct.pack_into("<I", _shm, _SHM_RESP_OFFSET + 4, length)
+            struct.pack_into("<I", _shm, _SHM_RESP_OFFSET, shm_seq)
     except Exception as e:
         print(f"Error writing response: {e}")
 
 
 def dispatch_command(action: str, params: dict) -> dict:
     """Route command to appropriate handler and return result."""
+    handler = _DISPATCH.get(action)
+    if handler is None:
+        return _error_response(f"Unknown action: {action}")
+    return handler(params)
 
-    # Transport commands
-    if action == "transport.start":
-        return handle_transport_start()
-    elif action == "transport.stop":
-        return handle_transport_stop()
-    elif action == "transport.record":
-        return handle_transport_record()
-    elif action == "transport.getStatus":
-        return handle_transport_get_status()
-    elif action == "transport.setPosition":
-        return handle_transport_set_position(params)
-    elif action == "transport.getLength":
-        return handle_transport_get_length()
-    elif action == "transport.setLoopMode":
-        return handle_transport_set_loop_mode(params)
-    elif action == "transport.setPlaybackSpeed":
-        return handle_transport_set_playback_speed(params)
-
-    # Mixer commands
-    elif action == "mixer.getTrackCount":
-        return handle_mixer_get_track_count()
-    elif action == "mixer.getTrackInfo":
-        return handle_mixer_get_track_info(params)
-    elif action == "mixer.getAllTracks":
-        return handle_mixer_get_all_tracks(params)
-    elif action == "mixer.setTrackVolume":
-        return handle_mixer_set_track_volume(params)
-    elif action == "mixer.setTrackPan":
-        return handle_mixer_set_track_pan(params)
-    elif action == "mixer.muteTrack":
-        return handle_mixer_mute_track(params)
-    elif action == "mixer.soloTrack":
-        return handle_mixer_solo_track(params)
-    elif action == "mixer.armTrack":
-        return handle_mixer_arm_track(params)
-    elif action == "mixer.setTrackName":
-        return handle_mixer_set_track_name(params)
-    elif action == "mixer.setTrackColor":
-        return handle_mixer_set_track_color(params)
-    elif action == "mixer.setStereoSep":
-        return handle_mixer_set_stereo_sep(params)
-
-    # Channel commands
-    elif action == "channels.getCount":
-        return handle_channels_get_count(params)
-    elif action == "channels.getInfo":
-        return handle_channels_get_info(params)
-    elif action == "channels.getAll":
-        return handle_channels_get_all()
-    elif action == "channels.getSelected":
-        return handle_channels_get_selected()
-    elif action == "channels.select":
-        return handle_channels_select(params)
-    elif action == "channels.selectOne":
-        return handle_channels_select_one(params)
-    elif action == "channels.triggerNote":
-        return handle_channels_trigger_note(params)
-    elif action == "channels.setVolume":
-        return handle_channels_set_volume(params)
-    elif action == "channels.setPan":
-        return handle_channels_set_pan(params)
-    elif action == "channels.mute":
-        return handle_channels_mute(params)
-    elif action == "channels.solo":
-        return handle_channels_solo(params)
-    elif action == "channels.setName":
-        return handle_channels_set_name(params)
-    elif action == "channels.setColor":
-        return handle_channels_set_color(params)
-    elif action == "channels.routeToMixer":
-        return handle_channels_route_to_mixer(params)
-
-    # Step sequencer commands
-    elif action == "channels.getGridBit":
-        return handle_channels_get_grid_bit(params)
-    elif action == "channels.setGridBit":
-        return handle_channels_set_grid_bit(params)
-    elif action == "channels.getStepSequence":
-        return handle_channels_get_step_sequence(params)
-    elif action == "channels.setStepSequence":
-        return handle_channels_set_step_sequence(params)
-
-    # Plugin commands
-    elif action == "plugins.isValid":
-        return handle_plugins_is_valid(params)
-    elif action == "plugins.getName":
-        return handle_plugins_get_name(params)
-    elif action == "plugins.getParamCount":
-        return handle_plugins_get_param_count(params)
-    elif action == "plugins.getParams":
-        return handle_plugins_get_params(params)
-    elif action == "plugins.getParamValue":
-        return handle_plugins_get_param_value(params)
-    elif action == "plugins.setParamValue":
-        return handle_plugins_set_param_value(params)
-    elif action == "plugins.getPresetCount":
-        return handle_plugins_get_preset_count(params)
-    elif action == "plugins.nextPreset":
-        return handle_plugins_next_preset(params)
-    elif action == "plugins.prevPreset":
-        return handle_plugins_prev_preset(params)
-    elif action == "plugins.getColor":
-        return handle_plugins_get_color(params)
 
-    else:
-        return {"error": f"Unknown action: {action}"}
+def _pack_color(params: dict) -> int:
+    """Pack r/g/b params into FL Studio's BGR color int.
+
+    A pre-packed value passed as "rgb" is used as-is.
+    """
+    if "rgb" in params:
+        return params["rgb"]
+    get = params.get
+    return get("r", 0) | (get("g", 0) << 8) | (get("b", 0) << 16)
+
+
+def _format_color(color: int) -> str:
+    """Format a BGR color int as RGB(r, g, b)."""
+    return f"RGB({color & 0xFF}, {(color >> 8) & 0xFF}, {(color >> 16) & 0xFF})"
 
 
 # =============================================================================
@@ -313,7 +428,7 @@ def handle_transport_set_playback_speed(params: dict) -> dict:
 
 def handle_mixer_get_track_count() -> dict:
     """Get number of mixer tracks."""
-    return {"count": mixer.trackCount()}
+    return {"count": _cached_count("mixer.trackCount", mixer.trackCount)}
 
 
 def handle_mixer_get_track_info(params: dict) -> dict:
@@ -329,34 +444,47 @@ def handle_mixer_get_track_info(params: dict) -> dict:
         "is_muted": mixer.isTrackMuted(track) == 1,
         "is_solo": mixer.isTrackSolo(track) == 1,
         "is_armed": mixer.isTrackArmed(track) == 1,
-        "color": hex(mixer.getTrackColor(track)),
+        "color": format(mixer.getTrackColor(track), "#x"),
     }
 
 
-def handle_mixer_get_all_tracks(params: dict) -> dict:
-    """Get info about all mixer tracks."""
-    include_empty = params.get("include_empty", False)
-    tracks = []
-    track_count = mixer.trackCount()
-
-    for i in range(track_count):
-        name = mixer.getTrackName(i)
+# Column names for the mixer.getAllTracks rows
+_ALL_TRACKS_FIELDS = ("index", "name", "volume", "pan", "is_muted", "is_solo")
 
-        # Skip empty tracks if requested
-        if not include_empty and (not name or name.startswith("Insert ")):
-            if i != 0:  # Always include master
-                continue
 
-        tracks.append({
-            "index": i,
-            "name": name if name else ("Master" if i == 0 else f"Insert {i}"),
-            "volume": mixer.getTrackVolume(i),
-            "pan": mixer.getTrackPan(i),
-            "is_muted": mixer.isTrackMuted(i) == 1,
-            "is_solo": mixer.isTrackSolo(i) == 1,
-        })
-
-    return {"tracks": tracks}
+def handle_mixer_get_all_tracks(params: dict) -> dict:
+    """Get info about all mixer tracks, as {fields, rows} columns."""
+    include_empty = params.get("include_empty", False)
+    get_name = mixer.getTrackName
+    get_volume = mixer.getTrackVolume
+    get_pan = mixer.getTrackPan
+    is_muted = mixer.isTrackMuted
+    is_solo = mixer.isTrackSolo
+
+    track_count = _cached_count("mixer.trackCount", mixer.trackCount)
+    names = [get_name(i) for i in range(track_count)]
+    rows = [
+        [
+            i,
+            name or _default_track_name(i),
+            get_volume(i),
+            get_pan(i),
+            is_muted(i) == 1,
+            is_solo(i) == 1,
+        ]
+        for i, name in enumerate(names)
+        # Skip empty tracks if requested (master is always included)
+        if include_empty or i == 0 or (name and not name.startswith("Insert "))
+    ]
+
+    return {"fields": _ALL_TRACKS_FIELDS, "rows": rows}
+
+
+def _default_track_name(index: int) -> str:
+    """Name shown for a mixer track that has no custom name."""
+    if index == 0:
+        return "Master"
+    return _INSERT_NAMES[index] if index < 256 else f"Insert {index}"
 
 
 def handle_mixer_set_track_volume(params: dict) -> dict:
@@ -364,8 +492,9 @@ def handle_mixer_set_track_volume(params: dict) -> dict:
     track = params.get("track", 0)
     volume = params.get("volume", 0.8)
     mixer.setTrackVolume(track, volume)
+    # Only the dB representation needs a readback
     return {
-        "volume": mixer.getTrackVolume(track),
+        "volume": volume,
         "volume_db": mixer.getTrackVolume(track, 1),
     }
 
@@ -381,12 +510,7 @@ def handle_mixer_set_track_pan(params: dict) -> dict:
 def handle_mixer_mute_track(params: dict) -> dict:
     """Mute/unmute mixer track."""
     track = params.get("track", 0)
-    muted = params.get("muted")  # None = toggle
-
-    if muted is None:
-        mixer.muteTrack(track, -1)
-    else:
-        mixer.muteTrack(track, 1 if muted else 0)
+    mixer.muteTrack(track, _TRI_STATE_VALUES[params.get("state", _TRI_STATE_TOGGLE)])
 
     return {
         "is_muted": mixer.isTrackMuted(track) == 1,
@@ -397,13 +521,8 @@ def handle_mixer_mute_track(params: dict) -> dict:
 def handle_mixer_solo_track(params: dict) -> dict:
     """Solo/unsolo mixer track."""
     track = params.get("track", 0)
-    solo = params.get("solo")  # None = toggle
     mode = params.get("mode", 3)
-
-    if solo is None:
-        mixer.soloTrack(track, -1, mode)
-    else:
-        mixer.soloTrack(track, 1 if solo else 0, mode)
+    mixer.soloTrack(track, _TRI_STATE_VALUES[params.get("state", _TRI_STATE_TOGGLE)], mode)
 
     return {
         "is_solo": mixer.isTrackSolo(track) == 1,
@@ -432,13 +551,9 @@ def handle_mixer_set_track_name(params: dict) -> dict:
 def handle_mixer_set_track_color(params: dict) -> dict:
     """Set mixer track color."""
     track = params.get("track", 0)
-    r = params.get("r", 0)
-    g = params.get("g", 0)
-    b = params.get("b", 0)
-    # FL Studio uses BGR format
-    color = (b << 16) | (g << 8) | r
+    color = _pack_color(params)
     mixer.setTrackColor(track, color)
-    return {"color": f"RGB({r}, {g}, {b})"}
+    return {"color": _format_color(color)}
 
 
 def handle_mixer_set_stereo_sep(params: dict) -> dict:
@@ -457,7 +572,8 @@ def handle_mixer_set_stereo_sep(params: dict) -> dict:
 def handle_channels_get_count(params: dict) -> dict:
     """Get number of channels."""
     global_count = params.get("global_count", True)
-    return {"count": channels.channelCount(global_count)}
+    key = ("channels.channelCount", global_count)
+    return {"count": _cached_count(key, channels.channelCount, global_count)}
 
 
 def handle_channels_get_info(params: dict) -> dict:
@@ -468,7 +584,7 @@ def handle_channels_get_info(params: dict) -> dict:
     return {
         "index": index,
         "name": channels.getChannelName(index, use_global),
-        "color": hex(channels.getChannelColor(index, use_global)),
+        "color": format(channels.getChannelColor(index, use_global), "#x"),
         "volume": channels.getChannelVolume(index, use_global),
         "pan": channels.getChannelPan(index, use_global),
         "pitch": channels.getChannelPitch(index, useGlobalIndex=use_global),
@@ -479,21 +595,30 @@ def handle_channels_get_info(params: dict) -> dict:
     }
 
 
-def handle_channels_get_all() -> dict:
-    """Get info about all channels."""
-    channels_list = []
-    count = channels.channelCount(True)
+# Column names for the channels.getAll rows
+_ALL_CHANNELS_FIELDS = ("index", "name", "is_muted", "is_selected", "target_fx_track")
 
-    for i in range(count):
-        channels_list.append({
-            "index": i,
-            "name": channels.getChannelName(i, True),
-            "is_muted": channels.isChannelMuted(i, True) == 1,
-            "is_selected": channels.isChannelSelected(i, True) == 1,
-            "target_fx_track": channels.getTargetFxTrack(i, True),
-        })
 
-    return {"channels": channels_list}
+def handle_channels_get_all() -> dict:
+    """Get info about all channels, as {fields, rows} columns."""
+    get_name = channels.getChannelName
+    is_muted = channels.isChannelMuted
+    is_selected = channels.isChannelSelected
+    get_fx_track = channels.getTargetFxTrack
+    count = _cached_count(("channels.channelCount", True), channels.channelCount, True)
+
+    rows = [
+        [
+            i,
+            get_name(i, True),
+            is_muted(i, True) == 1,
+            is_selected(i, True) == 1,
+            get_fx_track(i, True),
+        ]
+        for i in range(count)
+    ]
+
+    return {"fields": _ALL_CHANNELS_FIELDS, "rows": rows}
 
 
 def handle_channels_get_selected() -> dict:
@@ -533,12 +658,15 @@ def handle_channels_select_one(params: dict) -> dict:
     return {"channel_name": channels.getChannelName(index, True)}
 
 
+_TRIGGER_NOTE_DEFAULTS = {"channel": 0, "note": 60, "velocity": 100, "midi_channel": -1}
+
+
 def handle_channels_trigger_note(params: dict) -> dict:
     """Trigger a MIDI note on a channel."""
-    channel = params.get("channel", 0)
-    note = params.get("note", 60)
-    velocity = params.get("velocity", 100)
-    midi_channel = params.get("midi_channel", -1)
+    p = {**_TRIGGER_NOTE_DEFAULTS, **params}
+    channel, note, velocity, midi_channel = (
+        p["channel"], p["note"], p["velocity"], p["midi_channel"]
+    )
     channels.midiNoteOn(channel, note, velocity, midi_channel)
     return {"triggered": True, "note": note, "velocity": velocity}
 
@@ -549,7 +677,7 @@ def handle_channels_set_volume(params: dict) -> dict:
     volume = params.get("volume", 0.8)
     channels.setChannelVolume(index, volume, True)
     return {
-        "volume": channels.getChannelVolume(index, True),
+        "volume": volume,
         "channel_name": channels.getChannelName(index, True),
     }
 
@@ -560,7 +688,7 @@ def handle_channels_set_pan(params: dict) -> dict:
     pan = params.get("pan", 0.0)
     channels.setChannelPan(index, pan, True)
     return {
-        "pan": channels.getChannelPan(index, True),
+        "pan": pan,
         "channel_name": channels.getChannelName(index, True),
     }
 
@@ -568,12 +696,7 @@ def handle_channels_set_pan(params: dict) -> dict:
 def handle_channels_mute(params: dict) -> dict:
     """Mute/unmute channel."""
     index = params.get("index", 0)
-    muted = params.get("muted")  # None = toggle
-
-    if muted is None:
-        channels.muteChannel(index, -1, True)
-    else:
-        channels.muteChannel(index, 1 if muted else 0, True)
+    channels.muteChannel(index, _TRI_STATE_VALUES[params.get("state", _TRI_STATE_TOGGLE)], True)
 
     return {
         "is_muted": channels.isChannelMuted(index, True) == 1,
@@ -584,12 +707,7 @@ def handle_channels_mute(params: dict) -> dict:
 def handle_channels_solo(params: dict) -> dict:
     """Solo/unsolo channel."""
     index = params.get("index", 0)
-    solo = params.get("solo")  # None = toggle
-
-    if solo is None:
-        channels.soloChannel(index, -1, True)
-    else:
-        channels.soloChannel(index, 1 if solo else 0, True)
+    channels.soloChannel(index, _TRI_STATE_VALUES[params.get("state", _TRI_STATE_TOGGLE)], True)
 
     return {
         "is_solo": channels.isChannelSolo(index, True) == 1,
@@ -608,13 +726,9 @@ def handle_channels_set_name(params: dict) -> dict:
 def handle_channels_set_color(params: dict) -> dict:
     """Set channel color."""
     index = params.get("index", 0)
-    r = params.get("r", 0)
-    g = params.get("g", 0)
-    b = params.get("b", 0)
-    # FL Studio uses BGR format
-    color = (b << 16) | (g << 8) | r
+    color = _pack_color(params)
     channels.setChannelColor(index, color, True)
-    return {"color": f"RGB({r}, {g}, {b})"}
+    return {"color": _format_color(color)}
 
 
 def handle_channels_route_to_mixer(params: dict) -> dict:
@@ -652,30 +766,48 @@ def handle_channels_set_grid_bit(params: dict) -> dict:
     }
 
 
+# Step masks travel as JSON integers, which orjson limits to 64 bits
+_MAX_STEPS = 64
+
+
 def handle_channels_get_step_sequence(params: dict) -> dict:
-    """Get step sequence for a channel."""
+    """Get step sequence for a channel as a bitmask (bit i = step i)."""
     channel = params.get("channel", 0)
-    steps = params.get("steps", 16)
-    sequence = []
+    steps = min(params.get("steps", 16), _MAX_STEPS)
+    get_bit = channels.getGridBit
+    mask = 0
 
     for i in range(steps):
-        sequence.append(channels.getGridBit(channel, i, True) == 1)
+        if get_bit(channel, i, True):
+            mask |= 1 << i
 
-    return {"sequence": sequence}
+    return {"mask": mask, "steps": steps}
 
 
 def handle_channels_set_step_sequence(params: dict) -> dict:
-    """Set complete step sequence for a channel."""
+    """Set complete step sequence for a channel from a bitmask (bit i = step i).
+
+    Also accepts the older "pattern" list of booleans.
+    """
     channel = params.get("channel", 0)
-    pattern = params.get("pattern", [])
+    if "mask" in params:
+        mask = params["mask"]
+        length = params.get("length", 16)
+        if not isinstance(mask, int):
+            # orjson reads integers wider than 64 bits as floats
+            return _error_response("Pattern mask must be an integer of at most 64 bits")
+    else:
+        pattern = params.get("pattern", [])
+        mask = sum(1 << i for i, value in enumerate(pattern) if value)
+        length = len(pattern)
 
-    for i, value in enumerate(pattern):
-        channels.setGridBit(channel, i, 1 if value else 0, True)
+    set_bit = channels.setGridBit
+    for i in range(length):
+        set_bit(channel, i, (mask >> i) & 1, True)
 
-    active_steps = sum(pattern)
     return {
-        "active_steps": active_steps,
-        "total_steps": len(pattern),
+        "active_steps": bin(mask & ((1 << length) - 1)).count("1"),
+        "total_steps": length,
         "channel_name": channels.getChannelName(channel, True),
     }
 
@@ -685,77 +817,65 @@ def handle_channels_set_step_sequence(params: dict) -> dict:
 # =============================================================================
 
 
-def handle_plugins_is_valid(params: dict) -> dict:
-    """Check if plugin exists at location."""
-    index = params.get("index", 0)
-    slot_index = params.get("slot_index", -1)
-    use_global = params.get("use_global", True)
+def _plugin_location(index: int, slot_index: int, use_global: bool) -> tuple:
+    """Build the (index, slotIndex, useGlobalIndex) args for plugins.* calls.
 
+    Mixer effect slots (slot_index >= 0) always use global indexing.
+    """
     if slot_index >= 0:
-        valid = plugins.isValid(index, slot_index, True)
-    else:
-        valid = plugins.isValid(index, -1, use_global)
+        return (index, slot_index, True)
+    return (index, -1, use_global)
 
-    return {"valid": valid == 1}
 
+def _plugin_args(params: dict) -> tuple:
+    """Build plugins.* location args from a command's index/slot_index/use_global."""
+    return _plugin_location(
+        params.get("index", 0), params.get("slot_index", -1), params.get("use_global", True)
+    )
 
-def handle_plugins_get_name(params: dict) -> dict:
-    """Get plugin name."""
-    index = params.get("index", 0)
-    slot_index = params.get("slot_index", -1)
-    use_global = params.get("use_global", True)
 
-    if slot_index >= 0:
-        name = plugins.getPluginName(index, slot_index, True)
-    else:
-        name = plugins.getPluginName(index, -1, use_global)
+def handle_plugins_is_valid(params: dict) -> dict:
+    """Check if plugin exists at location."""
+    return {"valid": plugins.isValid(*_plugin_args(params)) == 1}
 
-    return {"name": name}
+
+def handle_plugins_get_name(params: dict) -> dict:
+    """Get plugin name."""
+    return {"name": plugins.getPluginName(*_plugin_args(params))}
 
 
 def handle_plugins_get_param_count(params: dict) -> dict:
     """Get number of plugin parameters."""
-    index = params.get("index", 0)
-    slot_index = params.get("slot_index", -1)
-    use_global = params.get("use_global", True)
+    args = _plugin_args(params)
+    return {"count": _cached_count(("plugins.getParamCount", args), plugins.getParamCount, *args)}
 
-    if slot_index >= 0:
-        count = plugins.getParamCount(index, slot_index, True)
-    else:
-        count = plugins.getParamCount(index, -1, use_global)
 
-    return {"count": count}
+_GET_PARAMS_DEFAULTS = {"index": 0, "slot_index": -1, "use_global": True, "max_params": 50}
 
 
 def handle_plugins_get_params(params: dict) -> dict:
     """Get all plugin parameters."""
-    index = params.get("index", 0)
-    slot_index = params.get("slot_index", -1)
-    use_global = params.get("use_global", True)
-    max_params = params.get("max_params", 50)
+    p = {**_GET_PARAMS_DEFAULTS, **params}
+    index, slot_index, use_global, max_params = (
+        p["index"], p["slot_index"], p["use_global"], p["max_params"]
+    )
 
-    if slot_index >= 0:
-        param_count = plugins.getParamCount(index, slot_index, True)
-    else:
-        param_count = plugins.getParamCount(index, -1, use_global)
+    location = _plugin_location(index, slot_index, use_global)
+    get_name = plugins.getParamName
+    get_value = plugins.getParamValue
+    get_value_str = plugins.getParamValueString
 
     param_list = []
+    param_count = _cached_count(
+        ("plugins.getParamCount", location), plugins.getParamCount, *location
+    )
     for i in range(min(param_count, max_params)):
         try:
-            if slot_index >= 0:
-                name = plugins.getParamName(i, index, slot_index, True)
-                value = plugins.getParamValue(i, index, slot_index, True)
-                value_str = plugins.getParamValueString(i, index, slot_index, True)
-            else:
-                name = plugins.getParamName(i, index, -1, use_global)
-                value = plugins.getParamValue(i, index, -1, use_global)
-                value_str = plugins.getParamValueString(i, index, -1, use_global)
-
             param_list.append({
                 "index": i,
-                "name": name,
-                "value": value,
-                "value_string": value_str,
+                "name": get_name(i, *location),
+                "value": get_value(i, *location),
+                "value_string": get_value_str(i, *location),
             })
         except Exception:
             continue
@@ -763,111 +883,199 @@ def handle_plugins_get_params(params: dict) -> dict:
     return {"params": param_list}
 
 
+_GET_PARAM_VALUE_DEFAULTS = {
+    "param_index": 0, "plugin_index": 0, "slot_index": -1, "use_global": True,
+}
+
+
 def handle_plugins_get_param_value(params: dict) -> dict:
     """Get specific parameter value."""
-    param_index = params.get("param_index", 0)
-    plugin_index = params.get("plugin_index", 0)
-    slot_index = params.get("slot_index", -1)
-    use_global = params.get("use_global", True)
+    p = {**_GET_PARAM_VALUE_DEFAULTS, **params}
+    param_index, plugin_index, slot_index, use_global = (
+        p["param_index"], p["plugin_index"], p["slot_index"], p["use_global"]
+    )
 
-    if slot_index >= 0:
-        name = plugins.getParamName(param_index, plugin_index, slot_index, True)
-        value = plugins.getParamValue(param_index, plugin_index, slot_index, True)
-        value_str = plugins.getParamValueString(param_index, plugin_index, slot_index, True)
-    else:
-        name = plugins.getParamName(param_index, plugin_index, -1, use_global)
-        value = plugins.getParamValue(param_index, plugin_index, -1, use_global)
-        value_str = plugins.getParamValueString(param_index, plugin_index, -1, use_global)
+    args = (param_index, *_plugin_location(plugin_index, slot_index, use_global))
 
     return {
         "index": param_index,
-        "name": name,
-        "value": value,
-        "value_string": value_str,
+        "name": plugins.getParamName(*args),
+        "value": plugins.getParamValue(*args),
+        "value_string": plugins.getParamValueString(*args),
     }
 
 
+_SET_PARAM_VALUE_DEFAULTS = {
+    "param_index": 0, "value": 0.0, "plugin_index": 0, "slot_index": -1, "use_global": True,
+}
+
+
 def handle_plugins_set_param_value(params: dict) -> dict:
     """Set plugin parameter value."""
-    param_index = params.get("param_index", 0)
-    value = params.get("value", 0.0)
-    plugin_index = params.get("plugin_index", 0)
-    slot_index = params.get("slot_index", -1)
-    use_global = params.get("use_global", True)
-
-    if slot_index >= 0:
-        name = plugins.getParamName(param_index, plugin_index, slot_index, True)
-        plugins.setParamValue(value, param_index, plugin_index, slot_index, True)
-        new_value = plugins.getParamValue(param_index, plugin_index, slot_index, True)
-        value_str = plugins.getParamValueString(param_index, plugin_index, slot_index, True)
-    else:
-        name = plugins.getParamName(param_index, plugin_index, -1, use_global)
-        plugins.setParamValue(value, param_index, plugin_index, -1, use_global)
-        new_value = plugins.getParamValue(param_index, plugin_index, -1, use_global)
-        value_str = plugins.getParamValueString(param_index, plugin_index, -1, use_global)
+    p = {**_SET_PARAM_VALUE_DEFAULTS, **params}
+    param_index, value, plugin_index, slot_index, use_global = (
+        p["param_index"], p["value"], p["plugin_index"], p["slot_index"], p["use_global"]
+    )
+
+    # Plugins may clamp or quantize, so the value is read back; the name is
+    # only looked up when the caller didn't supply it.
+    args = (param_index, *_plugin_location(plugin_index, slot_index, use_global))
+    name = params.get("name")
+    if name is None:
+        name = plugins.getParamName(*args)
+    plugins.setParamValue(value, *args)
 
     return {
         "name": name,
-        "value": new_value,
-        "value_string": value_str,
+        "value": plugins.getParamValue(*args),
+        "value_string": plugins.getParamValueString(*args),
     }
 
 
 def handle_plugins_get_preset_count(params: dict) -> dict:
     """Get number of plugin presets."""
-    index = params.get("index", 0)
-    slot_index = params.get("slot_index", -1)
-    use_global = params.get("use_global", True)
-
-    if slot_index >= 0:
-        count = plugins.getPresetCount(index, slot_index, True)
-    else:
-        count = plugins.getPresetCount(index, -1, use_global)
-
-    return {"count": count}
+    return {"count": plugins.getPresetCount(*_plugin_args(params))}
 
 
 def handle_plugins_next_preset(params: dict) -> dict:
     """Switch to next preset."""
-    index = params.get("index", 0)
-    slot_index = params.get("slot_index", -1)
-    use_global = params.get("use_global", True)
-
-    if slot_index >= 0:
-        plugin_name = plugins.getPluginName(index, slot_index, True)
-        plugins.nextPreset(index, slot_index, True)
-    else:
-        plugin_name = plugins.getPluginName(index, -1, use_global)
-        plugins.nextPreset(index, -1, use_global)
-
+    args = _plugin_args(params)
+    plugin_name = plugins.getPluginName(*args)
+    plugins.nextPreset(*args)
     return {"plugin_name": plugin_name}
 
 
 def handle_plugins_prev_preset(params: dict) -> dict:
     """Switch to previous preset."""
-    index = params.get("index", 0)
-    slot_index = params.get("slot_index", -1)
-    use_global = params.get("use_global", True)
-
-    if slot_index >= 0:
-        plugin_name = plugins.getPluginName(index, slot_index, True)
-        plugins.prevPreset(index, slot_index, True)
-    else:
-        plugin_name = plugins.getPluginName(index, -1, use_global)
-        plugins.prevPreset(index, -1, use_global)
-
+    args = _plugin_args(params)
+    plugin_name = plugins.getPluginName(*args)
+    plugins.prevPreset(*args)
     return {"plugin_name": plugin_name}
 
 
 def handle_plugins_get_color(params: dict) -> dict:
     """Get plugin color."""
-    index = params.get("index", 0)
-    slot_index = params.get("slot_index", -1)
-    use_global = params.get("use_global", True)
+    return {"color": format(plugins.getColor(*_plugin_args(params)), "#x")}
+
+
+# =============================================================================
+# Batch Handler
+# =============================================================================
+
+
+def handle_batch(params: dict) -> dict:
+    """Run several commands in order and return one result per command.
+
+    A linked batch stops at the first failing command; the commands after it
+    are reported as skipped.
+    """
+    commands = params.get("commands", [])
+    linked = params.get("linked", False)
+    results = []
+    for command in commands:
+        try:
+            action = sys.intern(command.get("action", ""))
+            result = dispatch_command(action, command.get("params", {}))
+            result.setdefault("success", True)
+        except Exception as e:
+            result = _error_response(f"Error executing command: {e}")
+        results.append(result)
+        if linked and not result["success"]:
+            break
+
+    results.extend(
+        _error_response("Skipped: an earlier linked command failed")
+        for _ in range(len(commands) - len(results))
+    )
+    return {"results": results}
+
+
+# =============================================================================
+# Dispatch Table
+# =============================================================================
 
-    if slot_index >= 0:
-        color = plugins.getColor(index, slot_index, True)
-    else:
-        color = plugins.getColor(index, -1, use_global)
 
-    return {"color": hex(color)}
+# Action name -> handler. Built once at import; every handler takes the params dict.
+# Keys are string literals and therefore interned, as are incoming action names,
+# so lookups usually resolve on the identity check. A plain dict is already a
+# single hashed probe here. An offline perfect hash can't beat it in Python:
+# str hashes are randomized per process, so a table generated at build time
+# would not line up with hash(action) at runtime.
+_DISPATCH = {
+    # Transport
+    "transport.start": lambda p: handle_transport_start(),
+    "transport.stop": lambda p: handle_transport_stop(),
+    "transport.record": lambda p: handle_transport_record(),
+    "transport.getStatus": lambda p: handle_transport_get_status(),
+    "transport.setPosition": handle_transport_set_position,
+    "transport.getLength": lambda p: handle_transport_get_length(),
+    "transport.setLoopMode": handle_transport_set_loop_mode,
+    "transport.setPlaybackSpeed": handle_transport_set_playback_speed,
+
+    # Mixer
+    "mixer.getTrackCount": lambda p: handle_mixer_get_track_count(),
+    "mixer.getTrackInfo": handle_mixer_get_track_info,
+    "mixer.getAllTracks": handle_mixer_get_all_tracks,
+    "mixer.setTrackVolume": handle_mixer_set_track_volume,
+    "mixer.setTrackPan": handle_mixer_set_track_pan,
+    "mixer.muteTrack": handle_mixer_mute_track,
+    "mixer.soloTrack": handle_mixer_solo_track,
+    "mixer.armTrack": handle_mixer_arm_track,
+    "mixer.setTrackName": handle_mixer_set_track_name,
+    "mixer.setTrackColor": handle_mixer_set_track_color,
+    "mixer.setStereoSep": handle_mixer_set_stereo_sep,
+
+    # Channels
+    "channels.getCount": handle_channels_get_count,
+    "channels.getInfo": handle_channels_get_info,
+    "channels.getAll": lambda p: handle_channels_get_all(),
+    "channels.getSelected": lambda p: handle_channels_get_selected(),
+    "channels.select": handle_channels_select,
+    "channels.selectOne": handle_channels_select_one,
+    "channels.triggerNote": handle_channels_trigger_note,
+    "channels.setVolume": handle_channels_set_volume,
+    "channels.setPan": handle_channels_set_pan,
+    "channels.mute": handle_channels_mute,
+    "channels.solo": handle_channels_solo,
+    "channels.setName": handle_channels_set_name,
+    "channels.setColor": handle_channels_set_color,
+    "channels.routeToMixer": handle_channels_route_to_mixer,
+
+    # Step sequencer
+    "channels.getGridBit": handle_channels_get_grid_bit,
+    "channels.setGridBit": handle_channels_set_grid_bit,
+    "channels.getStepSequence": handle_channels_get_step_sequence,
+    "channels.setStepSequence": handle_channels_set_step_sequence,
+
+    # Plugins
+    "plugins.isValid": handle_plugins_is_valid,
+    "plugins.getName": handle_plugins_get_name,
+    "plugins.getParamCount": handle_plugins_get_param_count,
+    "plugins.getParams": handle_plugins_get_params,
+    "plugins.getParamValue": handle_plugins_get_param_value,
+    "plugins.setParamValue": handle_plugins_set_param_value,
+    "plugins.getPresetCount": handle_plugins_get_preset_count,
+    "plugins.nextPreset": handle_plugins_next_preset,
+    "plugins.prevPreset": handle_plugins_prev_preset,
+    "plugins.getColor": handle_plugins_get_color,
+
+    # Batch
+    "batch": handle_batch,
+}
+
+# Parameterless actions, called directly without parsing the command payload
+_NO_PARAM_DISPATCH = {
+    "transport.start": handle_transport_start,
+    "transport.stop": handle_transport_stop,
+    "transport.record": handle_transport_record,
+    "transport.getStatus": handle_transport_get_status,
+    "transport.getLength": handle_transport_get_length,
+    "mixer.getTrackCount": handle_mixer_get_track_count,
+    "channels.getAll": handle_channels_get_all,
+    "channels.getSelected": handle_channels_get_selected,
+}
+
+# Responses that never vary, encoded once (the handler still runs first)
+_STATIC_RESPONSES = {
+    "transport.stop": _dumps({"stopped": True, "success": True}),
+}
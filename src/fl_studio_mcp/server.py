@@ -65,6 +65,15 @@ def get_fl_status() -> str:
         return f"Not connected: {conn.connection_error}"
 
 
+# Fields of the fl://project resource, with the value used when FL omits one
+_PROJECT_DEFAULTS = {
+    "is_playing": False,
+    "is_recording": False,
+    "position": "",
+    "loop_mode": "pattern",
+}
+
+
 @mcp.resource("fl://project")
 def get_project_info() -> dict:
     """Get current FL Studio project information."""
@@ -74,18 +83,13 @@ def get_project_info() -> dict:
         return {"error": conn.connection_error}
 
     try:
-        result = conn.send_command("transport.getStatus")
-        if not result.get("success", False) and "error" in result:
-            return {"error": result["error"]}
-
-        return {
-            "is_playing": result.get("is_playing", False),
-            "is_recording": result.get("is_recording", False),
-            "position": result.get("position", ""),
-            "loop_mode": result.get("loop_mode", "pattern"),
-        }
-    except Exception as e:
+        result = conn.get_transport_status()
+    except RuntimeError as e:
         return {"error": str(e)}
+    if "error" in result:
+        return {"error": result["error"]}
+
+    return {**_PROJECT_DEFAULTS, **{k: result[k] for k in _PROJECT_DEFAULTS.keys() & result.keys()}}
 
 
 # Connection management tools
@@ -127,6 +131,43 @@ def fl_connection_status() -> dict:
     }
 
 
+@mcp.tool()
+def fl_batch(operations: list[dict], linked: bool = False) -> list[dict]:
+    """Run several FL Studio commands in a single round-trip.
+
+    Each operation is executed in order inside FL Studio, and one result is
+    returned per operation. Use this instead of many separate tool calls when
+    applying a group of changes (e.g. setting volumes on several tracks).
+
+    Args:
+        operations: List of operation objects with properties:
+                    - action (str): Controller command name, e.g. "mixer.setTrackVolume",
+                      "mixer.setTrackName", "channels.setColor", "channels.routeToMixer"
+                    - params (dict, optional): Parameters for that command
+        linked: If True, stop at the first failing operation; the remaining
+                operations are skipped and reported as failed
+
+    Example operations:
+        [
+            {"action": "mixer.setTrackName", "params": {"track": 1, "name": "Drums"}},
+            {"action": "mixer.setTrackVolume", "params": {"track": 1, "volume": 0.7}},
+            {"action": "channels.routeToMixer",
+             "params": {"channel_index": 0, "mixer_track": 1}},
+        ]
+    """
+    if not operations:
+        return [{"error": "No operations provided"}]
+
+    commands = []
+    for i, op in enumerate(operations):
+        if "action" not in op:
+            return [{"error": f"Operation {i} missing 'action' field"}]
+        commands.append((op["action"], op.get("params")))
+
+    conn = get_connection()
+    return conn.send_batch(commands, linked=linked)
+
+
 # Register all tools
 register_transport_tools(mcp)
 register_mixer_tools(mcp)
@@ -0,0 +1,150 @@
+"""Shared helpers for the FL Studio tool modules."""
+
+from __future__ import annotations
+
+import inspect
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
+
+if TYPE_CHECKING:
+    from fl_studio_mcp.utils.connection import FLConnection
+
+# Mute/solo flag -> "state" param understood by the controller script
+_TRI_STATE = {False: 0, True: 1, None: 2}
+
+
+def tri_state(flag: bool | None) -> int:
+    """Encode an on/off/toggle (None) flag as the controller's integer state."""
+    return _TRI_STATE[flag]
+
+
+# Accepted ranges for tool arguments: name -> (low, high, error message).
+# These guard input coming from MCP clients, so they stay active under -O.
+BOUNDS: dict[str, tuple[float, float, str]] = {
+    "volume": (0.0, 1.0, "Volume must be between 0.0 and 1.0"),
+    "pan": (-1.0, 1.0, "Pan must be between -1.0 and 1.0"),
+    "track_volume": (0.0, 1.25, "Volume should be between 0.0 and 1.25"),
+    "track_pan": (-1.0, 1.0, "Pan must be between -1.0 (left) and 1.0 (right)"),
+    "separation": (-1.0, 1.0, "Separation must be between -1.0 and 1.0"),
+    "note": (0, 127, "Note must be between 0 and 127"),
+    "velocity": (0, 127, "Velocity must be between 0 and 127"),
+    "midi_channel": (-1, 15, "MIDI channel must be between -1 and 15"),
+    "speed": (0.25, 4.0, "Speed must be between 0.25 and 4.0"),
+    # Step masks travel as JSON integers, which orjson limits to 64 bits
+    "steps": (0, 64, "Steps must be between 0 and 64"),
+    "offset": (0, float("inf"), "Offset must be non-negative"),
+    "limit": (0, float("inf"), "Limit must be non-negative"),
+}
+
+
+def check(bounds: str, value: float) -> str | None:
+    """Return an "Error: ..." message if value is outside BOUNDS[bounds], else None."""
+    low, high, error = BOUNDS[bounds]
+    if low <= value <= high:
+        return None
+    return f"Error: {error}"
+
+
+async def ranged_setter(
+    conn: FLConnection,
+    action: str,
+    index_key: str,
+    index: int,
+    value_key: str,
+    value: float,
+    bounds: str,
+) -> dict[str, Any]:
+    """Range-check a value, then send it with a single-index setter command.
+
+    Args:
+        conn: Connection to send the command on
+        action: Command action (e.g., "mixer.setTrackPan")
+        index_key: Parameter name for the track/channel index
+        index: Track/channel index
+        value_key: Parameter name for the value
+        value: Value to set
+        bounds: Name of the accepted range in BOUNDS
+
+    Returns:
+        Response dictionary from FL Studio, or an error response if the value
+        is out of range (nothing is sent in that case)
+    """
+    low, high, error = BOUNDS[bounds]
+    if not low <= value <= high:
+        return {"success": False, "error": error}
+    return await conn.send_command_async(action, {index_key: index, value_key: value})
+
+
+def columnar_to_dicts(payload: dict[str, Any]) -> list[dict[str, Any]]:
+    """Expand a {"fields": [...], "rows": [[...], ...]} response into one dict per row."""
+    fields = payload.get("fields", ())
+    return [dict(zip(fields, row)) for row in payload.get("rows", ())]
+
+
+@dataclass(frozen=True, slots=True)
+class ToolParam:
+    """One argument of a generated tool.
+
+    key is the command param it is sent as (defaults to name), and bounds
+    optionally names the accepted range in BOUNDS.
+    """
+
+    name: str
+    annotation: type
+    key: str | None = None
+    bounds: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class ToolSpec:
+    """Declarative description of a simple "send one command, report" tool.
+
+    message is a str.format template over the arguments and the response
+    fields listed in response_fields as (field, default template) pairs; the
+    default template is formatted with the arguments when FL omits the field.
+    """
+
+    name: str
+    action: str
+    doc: str
+    params: tuple[ToolParam, ...]
+    message: str
+    response_fields: tuple[tuple[str, str], ...] = ()
+
+
+def make_tool(spec: ToolSpec, conn: FLConnection) -> Callable[..., Awaitable[str]]:
+    """Build an async tool function from a spec that sends through ``conn``.
+
+    The function gets a real signature, annotations and docstring, so FastMCP
+    derives the same schema as for a hand-written tool.
+    """
+    params = spec.params
+    bounded = tuple(p for p in params if p.bounds is not None)
+
+    async def tool(**kwargs: Any) -> str:
+        for p in bounded:
+            error = check(p.bounds, kwargs[p.name])
+            if error:
+                return error
+
+        result = await conn.send_command_async(
+            spec.action, {p.key or p.name: kwargs[p.name] for p in params}
+        )
+
+        if not result.get("success", False) and "error" in result:
+            return f"Error: {result['error']}"
+
+        values = dict(kwargs)
+        for field, default in spec.response_fields:
+            values[field] = result[field] if field in result else default.format_map(kwargs)
+        return spec.message.format_map(values)
+
+    tool.__name__ = tool.__qualname__ = spec.name
+    tool.__doc__ = spec.doc
+    tool.__annotations__ = {p.name: p.annotation for p in params} | {"return": str}
+    kind = inspect.Parameter.POSITIONAL_OR_KEYWORD
+    tool.__signature__ = inspect.Signature(
+        [inspect.Parameter(p.name, kind, annotation=p.annotation) for p in params],
+        return_annotation=str,
+    )
+    return tool
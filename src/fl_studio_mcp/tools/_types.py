@@ -0,0 +1,53 @@
+"""Result types returned by the FL Studio tools."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from typing import Any
+
+
+@dataclass(frozen=True, slots=True)
+class ChannelInfo:
+    """Channel rack channel details, as returned by fl_get_channel_info."""
+
+    index: int = 0
+    name: str = ""
+    color: str = "0x0"
+    volume: float = 0
+    pan: float = 0
+    pitch: float = 0
+    is_muted: bool = False
+    is_solo: bool = False
+    is_selected: bool = False
+    target_fx_track: int = 0
+
+    @classmethod
+    def from_response(cls, result: dict[str, Any], index: int) -> ChannelInfo:
+        """Build from a channels.getInfo response; missing fields keep their defaults."""
+        return cls(index=index, **{k: v for k, v in result.items() if k in _CHANNEL_FIELDS})
+
+
+@dataclass(frozen=True, slots=True)
+class MixerTrackInfo:
+    """Mixer track details, as returned by fl_get_mixer_track_info."""
+
+    index: int = 0
+    name: str = ""
+    volume: float = 0
+    volume_db: float = 0
+    pan: float = 0
+    stereo_separation: float = 0
+    is_muted: bool = False
+    is_solo: bool = False
+    is_armed: bool = False
+    color: str = "0x0"
+
+    @classmethod
+    def from_response(cls, result: dict[str, Any], index: int) -> MixerTrackInfo:
+        """Build from a mixer.getTrackInfo response; missing fields keep their defaults."""
+        return cls(index=index, **{k: v for k, v in result.items() if k in _MIXER_TRACK_FIELDS})
+
+
+# Response keys copied into each type ("index" is always the requested one)
+_CHANNEL_FIELDS = frozenset(f.name for f in fields(ChannelInfo)) - {"index"}
+_MIXER_TRACK_FIELDS = frozenset(f.name for f in fields(MixerTrackInfo)) - {"index"}
@@ -4,24 +4,101 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
+from fl_studio_mcp.tools._helpers import (
+    ToolParam,
+    ToolSpec,
+    check,
+    columnar_to_dicts,
+    make_tool,
+    ranged_setter,
+    tri_state,
+)
+from fl_studio_mcp.tools._types import ChannelInfo
+from fl_studio_mcp.utils.connection import get_connection
+from fl_studio_mcp.utils.midi_connection import MIDIConnection
+
 if TYPE_CHECKING:
     from fastmcp import FastMCP
 
+_NOTE_NAMES = ("C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B")
+
+# Tools that send one command and report from a template
+_TOOL_SPECS = (
+    ToolSpec(
+        name="fl_select_one_channel",
+        action="channels.selectOne",
+        doc="""Select only one channel, deselecting all others.
+
+        Args:
+            index: Channel index (global) to select exclusively
+        """,
+        params=(ToolParam("index", int),),
+        message="Channel '{channel_name}' selected exclusively",
+        response_fields=(("channel_name", "Channel {index}"),),
+    ),
+    ToolSpec(
+        name="fl_set_channel_name",
+        action="channels.setName",
+        doc="""Set the name of a channel.
+
+        Args:
+            index: Channel index (global)
+            name: New name for the channel
+        """,
+        params=(ToolParam("index", int), ToolParam("name", str)),
+        message="Channel {index} renamed to '{name}'",
+    ),
+    ToolSpec(
+        name="fl_set_channel_color",
+        action="channels.setColor",
+        doc="""Set the color of a channel.
+
+        Args:
+            index: Channel index (global)
+            red: Red component (0-255)
+            green: Green component (0-255)
+            blue: Blue component (0-255)
+        """,
+        params=(
+            ToolParam("index", int),
+            ToolParam("red", int, "r"),
+            ToolParam("green", int, "g"),
+            ToolParam("blue", int, "b"),
+        ),
+        message="Channel {index} color set to RGB({red}, {green}, {blue})",
+    ),
+    ToolSpec(
+        name="fl_route_channel_to_mixer",
+        action="channels.routeToMixer",
+        doc="""Route a channel to a specific mixer track.
+
+        Args:
+            channel_index: Channel index (global)
+            mixer_track: Mixer track index to route to
+        """,
+        params=(ToolParam("channel_index", int), ToolParam("mixer_track", int)),
+        message="Channel '{channel_name}' routed to mixer track {mixer_track}",
+        response_fields=(("channel_name", "Channel {channel_index}"),),
+    ),
+)
+
 
 def register_channel_tools(mcp: FastMCP) -> None:
     """Register channel rack tools with the MCP server."""
-    from fl_studio_mcp.utils.connection import get_connection
+    conn = get_connection()
+
+    for spec in _TOOL_SPECS:
+        mcp.tool()(make_tool(spec, conn))
 
     @mcp.tool()
-    def fl_get_channel_count(global_count: bool = True) -> int:
+    async def fl_get_channel_count(global_count: bool = True) -> int:
         """Get the number of channels in the channel rack.
 
         Args:
             global_count: If True, returns total channels ignoring groups.
                          If False, returns channels in current group only.
         """
-        conn = get_connection()
-        result = conn.send_command("channels.getCount", {"global_count": global_count})
+        result = await conn.send_command_async("channels.getCount", {"global_count": global_count})
 
         if not result.get("success", False) and "error" in result:
             return -1
@@ -29,15 +106,16 @@ def register_channel_tools(mcp: FastMCP) -> None:
         return result.get("count", 0)
 
     @mcp.tool()
-    def fl_get_channel_info(index: int, use_global_index: bool = True) -> dict:
+    async def fl_get_channel_info(
+        index: int, use_global_index: bool = True
+    ) -> ChannelInfo | dict:
         """Get detailed information about a channel.
 
         Args:
             index: Channel index
             use_global_index: Whether to use global channel indexing
         """
-        conn = get_connection()
-        result = conn.send_command("channels.getInfo", {
+        result = await conn.send_command_async("channels.getInfo", {
             "index": index,
             "use_global": use_global_index,
         })
@@ -45,41 +123,28 @@ def register_channel_tools(mcp: FastMCP) -> None:
         if not result.get("success", False) and "error" in result:
             return {"error": result["error"]}
 
-        return {
-            "index": result.get("index", index),
-            "name": result.get("name", ""),
-            "color": result.get("color", "0x0"),
-            "volume": result.get("volume", 0),
-            "pan": result.get("pan", 0),
-            "pitch": result.get("pitch", 0),
-            "is_muted": result.get("is_muted", False),
-            "is_solo": result.get("is_solo", False),
-            "is_selected": result.get("is_selected", False),
-            "target_fx_track": result.get("target_fx_track", 0),
-        }
+        return ChannelInfo.from_response(result, index)
 
     @mcp.tool()
-    def fl_get_all_channels() -> list[dict]:
+    async def fl_get_all_channels() -> list[dict]:
         """Get information about all channels in the channel rack.
 
         Returns a list of all channels with their basic properties.
         """
-        conn = get_connection()
-        result = conn.send_command("channels.getAll")
+        result = await conn.send_command_async("channels.getAll")
 
         if not result.get("success", False) and "error" in result:
             return [{"error": result["error"]}]
 
-        return result.get("channels", [])
+        return columnar_to_dicts(result)
 
     @mcp.tool()
-    def fl_get_selected_channel() -> dict | None:
+    async def fl_get_selected_channel() -> dict | None:
         """Get information about the currently selected channel.
 
         Returns None if no channel is selected.
         """
-        conn = get_connection()
-        result = conn.send_command("channels.getSelected")
+        result = await conn.send_command_async("channels.getSelected")
 
         if not result.get("success", False) and "error" in result:
             return {"error": result["error"]}
@@ -87,15 +152,14 @@ def register_channel_tools(mcp: FastMCP) -> None:
         return result.get("channel")
 
     @mcp.tool()
-    def fl_select_channel(index: int, select: bool = True) -> str:
+    async def fl_select_channel(index: int, select: bool = True) -> str:
         """Select or deselect a channel.
 
         Args:
             index: Channel index (global)
             select: True to select, False to deselect
         """
-        conn = get_connection()
-        result = conn.send_command("channels.select", {
+        result = await conn.send_command_async("channels.select", {
             "index": index,
             "select": select,
         })
@@ -107,23 +171,7 @@ def register_channel_tools(mcp: FastMCP) -> None:
         return f"Channel '{channel_name}' {'selected' if select else 'deselected'}"
 
     @mcp.tool()
-    def fl_select_one_channel(index: int) -> str:
-        """Select only one channel, deselecting all others.
-
-        Args:
-            index: Channel index (global) to select exclusively
-        """
-        conn = get_connection()
-        result = conn.send_command("channels.selectOne", {"index": index})
-
-        if not result.get("success", False) and "error" in result:
-            return f"Error: {result['error']}"
-
-        channel_name = result.get("channel_name", f"Channel {index}")
-        return f"Channel '{channel_name}' selected exclusively"
-
-    @mcp.tool()
-    def fl_trigger_note(
+    async def fl_trigger_note(
         channel: int,
         note: int,
         velocity: int = 100,
@@ -134,52 +182,65 @@ def register_channel_tools(mcp: FastMCP) -> None:
         This triggers the note in real-time. To persist notes in a pattern,
         FL Studio must be in record mode, or use the step sequencer functions.
 
+        With midi_channel set (0-15) the note is sent as a plain MIDI Note On
+        without waiting for FL Studio to respond, which is the lowest-latency
+        option. FL Studio then routes it like any incoming MIDI note (to the
+        selected channel, or whichever channel listens on that MIDI channel)
+        instead of to `channel`.
+
         Args:
-            channel: Channel index (global)
+            channel: Channel index (global), used when midi_channel is -1
             note: MIDI note number (0-127, where 60 = C5/Middle C)
             velocity: Note velocity (1-127, 0 = note off)
-            midi_channel: MIDI channel (-1 for default)
+            midi_channel: MIDI channel 0-15 to send the note directly,
+                          or -1 (default) to play it on `channel`
         """
-        if not 0 <= note <= 127:
-            return "Error: Note must be between 0 and 127"
-        if not 0 <= velocity <= 127:
-            return "Error: Velocity must be between 0 and 127"
-
-        conn = get_connection()
-        result = conn.send_command("channels.triggerNote", {
-            "channel": channel,
-            "note": note,
-            "velocity": velocity,
-            "midi_channel": midi_channel,
-        })
+        error = (
+            check("note", note) or check("velocity", velocity)
+            or check("midi_channel", midi_channel)
+        )
+        if error:
+            return error
+
+        # Note 127 is the controller script's command trigger, so it can't be
+        # sent as a raw note
+        if midi_channel >= 0 and not (note == MIDIConnection.TRIGGER_NOTE and velocity > 0):
+            result = conn.send_raw_midi(0x90 | midi_channel, note, velocity) or {"success": True}
+            target = f"MIDI channel {midi_channel}"
+        else:
+            result = await conn.send_command_async("channels.triggerNote", {
+                "channel": channel,
+                "note": note,
+                "velocity": velocity,
+                "midi_channel": midi_channel,
+            })
+            target = f"channel {channel}"
 
         if not result.get("success", False) and "error" in result:
             return f"Error: {result['error']}"
 
-        note_names = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
-        note_name = note_names[note % 12]
-        octave = (note // 12) - 1
+        octave, pitch = divmod(note, 12)
+        note_name = _NOTE_NAMES[pitch]
+        octave -= 1
 
         if velocity == 0:
-            return f"Note {note_name}{octave} (MIDI {note}) released on channel {channel}"
-        return f"Note {note_name}{octave} (MIDI {note}) triggered with velocity {velocity} on channel {channel}"
+            return f"Note {note_name}{octave} (MIDI {note}) released on {target}"
+        return (
+            f"Note {note_name}{octave} (MIDI {note}) triggered with velocity {velocity} on {target}"
+        )
 
     @mcp.tool()
-    def fl_set_channel_volume(index: int, volume: float) -> str:
+    async def fl_set_channel_volume(index: int, volume: float) -> str:
         """Set the volume of a channel.
 
         Args:
             index: Channel index (global)
             volume: Volume level from 0.0 (silence) to 1.0 (full)
         """
-        if not 0.0 <= volume <= 1.0:
-            return "Error: Volume must be between 0.0 and 1.0"
-
-        conn = get_connection()
-        result = conn.send_command("channels.setVolume", {
-            "index": index,
-            "volume": volume,
-        })
+        result = await ranged_setter(
+            conn, "channels.setVolume", "index", index, "volume", volume,
+            "volume",
+        )
 
         if not result.get("success", False) and "error" in result:
             return f"Error: {result['error']}"
@@ -189,21 +250,17 @@ def register_channel_tools(mcp: FastMCP) -> None:
         return f"Channel '{channel_name}' volume set to {new_volume:.2f}"
 
     @mcp.tool()
-    def fl_set_channel_pan(index: int, pan: float) -> str:
+    async def fl_set_channel_pan(index: int, pan: float) -> str:
         """Set the pan position of a channel.
 
         Args:
             index: Channel index (global)
             pan: Pan from -1.0 (full left) to 1.0 (full right), 0.0 = center
         """
-        if not -1.0 <= pan <= 1.0:
-            return "Error: Pan must be between -1.0 and 1.0"
-
-        conn = get_connection()
-        result = conn.send_command("channels.setPan", {
-            "index": index,
-            "pan": pan,
-        })
+        result = await ranged_setter(
+            conn, "channels.setPan", "index", index, "pan", pan,
+            "pan",
+        )
 
         if not result.get("success", False) and "error" in result:
             return f"Error: {result['error']}"
@@ -213,17 +270,16 @@ def register_channel_tools(mcp: FastMCP) -> None:
         return f"Channel '{channel_name}' pan set to {new_pan:.2f}"
 
     @mcp.tool()
-    def fl_mute_channel(index: int, muted: bool | None = None) -> str:
+    async def fl_mute_channel(index: int, muted: bool | None = None) -> str:
         """Mute or unmute a channel.
 
         Args:
             index: Channel index (global)
             muted: True to mute, False to unmute, None to toggle
         """
-        conn = get_connection()
-        result = conn.send_command("channels.mute", {
+        result = await conn.send_command_async("channels.mute", {
             "index": index,
-            "muted": muted,
+            "state": tri_state(muted),
         })
 
         if not result.get("success", False) and "error" in result:
@@ -234,17 +290,16 @@ def register_channel_tools(mcp: FastMCP) -> None:
         return f"Channel '{channel_name}' {'muted' if is_muted else 'unmuted'}"
 
     @mcp.tool()
-    def fl_solo_channel(index: int, solo: bool | None = None) -> str:
+    async def fl_solo_channel(index: int, solo: bool | None = None) -> str:
         """Solo or unsolo a channel.
 
         Args:
             index: Channel index (global)
             solo: True to solo, False to unsolo, None to toggle
         """
-        conn = get_connection()
-        result = conn.send_command("channels.solo", {
+        result = await conn.send_command_async("channels.solo", {
             "index": index,
-            "solo": solo,
+            "state": tri_state(solo),
         })
 
         if not result.get("success", False) and "error" in result:
@@ -255,79 +310,94 @@ def register_channel_tools(mcp: FastMCP) -> None:
         return f"Channel '{channel_name}' {'soloed' if is_solo else 'unsoloed'}"
 
     @mcp.tool()
-    def fl_set_channel_name(index: int, name: str) -> str:
-        """Set the name of a channel.
-
-        Args:
-            index: Channel index (global)
-            name: New name for the channel
-        """
-        conn = get_connection()
-        result = conn.send_command("channels.setName", {
-            "index": index,
-            "name": name,
-        })
-
-        if not result.get("success", False) and "error" in result:
-            return f"Error: {result['error']}"
-
-        return f"Channel {index} renamed to '{name}'"
+    async def fl_channel_configure(
+        index: int,
+        name: str | None = None,
+        color: list[int] | None = None,
+        mixer_track: int | None = None,
+        volume: float | None = None,
+        pan: float | None = None,
+    ) -> str:
+        """Apply several settings to a channel in a single round-trip.
 
-    @mcp.tool()
-    def fl_set_channel_color(index: int, red: int, green: int, blue: int) -> str:
-        """Set the color of a channel.
+        Same effect as calling fl_set_channel_name, fl_set_channel_color,
+        fl_route_channel_to_mixer, fl_set_channel_volume and fl_set_channel_pan
+        in that order, but FL Studio receives them as one linked batch. If a
+        step fails, the remaining steps are not applied.
 
         Args:
             index: Channel index (global)
-            red: Red component (0-255)
-            green: Green component (0-255)
-            blue: Blue component (0-255)
-        """
-        conn = get_connection()
-        result = conn.send_command("channels.setColor", {
-            "index": index,
-            "r": red,
-            "g": green,
-            "b": blue,
-        })
-
-        if not result.get("success", False) and "error" in result:
-            return f"Error: {result['error']}"
-
-        return f"Channel {index} color set to RGB({red}, {green}, {blue})"
-
-    @mcp.tool()
-    def fl_route_channel_to_mixer(channel_index: int, mixer_track: int) -> str:
-        """Route a channel to a specific mixer track.
-
-        Args:
-            channel_index: Channel index (global)
+            name: New name for the channel
+            color: [red, green, blue] components (0-255 each)
             mixer_track: Mixer track index to route to
+            volume: Volume level from 0.0 (silence) to 1.0 (full)
+            pan: Pan from -1.0 (full left) to 1.0 (full right), 0.0 = center
         """
-        conn = get_connection()
-        result = conn.send_command("channels.routeToMixer", {
-            "channel_index": channel_index,
-            "mixer_track": mixer_track,
-        })
-
-        if not result.get("success", False) and "error" in result:
-            return f"Error: {result['error']}"
-
-        channel_name = result.get("channel_name", f"Channel {channel_index}")
-        return f"Channel '{channel_name}' routed to mixer track {mixer_track}"
+        if color is not None and len(color) != 3:
+            return "Error: Color must be a [red, green, blue] list"
+        if volume is not None and (error := check("volume", volume)):
+            return error
+        if pan is not None and (error := check("pan", pan)):
+            return error
+
+        # (description, action, params) in the order the tools would be called
+        steps = []
+        if name is not None:
+            steps.append((f"renamed to '{name}'", "channels.setName", {
+                "index": index,
+                "name": name,
+            }))
+        if color is not None:
+            red, green, blue = color
+            steps.append((f"color set to RGB({red}, {green}, {blue})", "channels.setColor", {
+                "index": index,
+                "r": red,
+                "g": green,
+                "b": blue,
+            }))
+        if mixer_track is not None:
+            steps.append((f"routed to mixer track {mixer_track}", "channels.routeToMixer", {
+                "channel_index": index,
+                "mixer_track": mixer_track,
+            }))
+        if volume is not None:
+            steps.append((f"volume set to {volume:.2f}", "channels.setVolume", {
+                "index": index,
+                "volume": volume,
+            }))
+        if pan is not None:
+            steps.append((f"pan set to {pan:.2f}", "channels.setPan", {
+                "index": index,
+                "pan": pan,
+            }))
+
+        if not steps:
+            return "Error: No settings provided"
+
+        results = await conn.send_batch_async(
+            [(action, params) for _, action, params in steps], linked=True
+        )
+
+        applied = []
+        for (description, _, _), result in zip(steps, results):
+            if not result.get("success", False) and "error" in result:
+                done = f" (already applied: {', '.join(applied)})" if applied else ""
+                return f"Error: {result['error']}{done}"
+            applied.append(description)
+
+        return f"Channel {index} {', '.join(applied)}"
 
     # Step Sequencer Tools
 
     @mcp.tool()
-    def fl_get_grid_bit(channel: int, position: int) -> bool:
+    async def fl_get_grid_bit(channel: int, position: int) -> bool:
         """Get whether a step is active in the step sequencer.
 
         Args:
             channel: Channel index (global)
             position: Step position (0-based)
         """
-        conn = get_connection()
-        result = conn.send_command("channels.getGridBit", {
+        result = await conn.send_command_async("channels.getGridBit", {
             "channel": channel,
             "position": position,
         })
@@ -338,18 +408,20 @@ def register_channel_tools(mcp: FastMCP) -> None:
         return result.get("value", False)
 
     @mcp.tool()
-    def fl_set_grid_bit(channel: int, position: int, value: bool) -> str:
+    async def fl_set_grid_bit(channel: int, position: int, value: bool) -> str:
         """Set a step in the step sequencer on or off.
 
         This allows basic pattern programming for drum-style instruments.
+        To write a whole pattern, prefer fl_set_step_sequence (bitmask) or
+        fl_set_step_sequence_list over looping this tool: they send every step
+        in one command.
 
         Args:
             channel: Channel index (global)
             position: Step position (0-based)
             value: True to enable the step, False to disable
         """
-        conn = get_connection()
-        result = conn.send_command("channels.setGridBit", {
+        result = await conn.send_command_async("channels.setGridBit", {
             "channel": channel,
             "position": position,
             "value": value,
@@ -362,42 +434,75 @@ def register_channel_tools(mcp: FastMCP) -> None:
         return f"Channel '{channel_name}' step {position} {'enabled' if value else 'disabled'}"
 
     @mcp.tool()
-    def fl_get_step_sequence(channel: int, steps: int = 16) -> list[bool]:
-        """Get the step sequence pattern for a channel.
+    async def fl_get_step_sequence(channel: int, steps: int = 16) -> int:
+        """Get the step sequence pattern for a channel as a bitmask.
+
+        Bit i of the result is set when step i is on, e.g. 0x1111 is a
+        four-on-the-floor kick over 16 steps. Returns -1 on error.
 
         Args:
             channel: Channel index (global)
-            steps: Number of steps to retrieve (default 16)
+            steps: Number of steps to retrieve, 0-64 (default 16)
         """
-        conn = get_connection()
-        result = conn.send_command("channels.getStepSequence", {
+        if check("steps", steps):
+            return -1
+
+        result = await conn.send_command_async("channels.getStepSequence", {
             "channel": channel,
             "steps": steps,
         })
 
         if not result.get("success", False) and "error" in result:
-            return []
+            return -1
 
-        return result.get("sequence", [])
+        return result.get("mask", 0)
 
-    @mcp.tool()
-    def fl_set_step_sequence(channel: int, pattern: list[bool]) -> str:
-        """Set a complete step sequence pattern for a channel.
+    async def _set_step_sequence(channel: int, mask: int, steps: int) -> str:
+        if mask < 0:
+            return "Error: Pattern mask must be non-negative"
+        if error := check("steps", steps):
+            return error
 
-        Args:
-            channel: Channel index (global)
-            pattern: List of boolean values for each step (True = on, False = off)
-        """
-        conn = get_connection()
-        result = conn.send_command("channels.setStepSequence", {
+        # Only the written steps are sent, so the mask fits in 64 bits
+        mask &= (1 << steps) - 1
+        result = await conn.send_command_async("channels.setStepSequence", {
             "channel": channel,
-            "pattern": pattern,
+            "mask": mask,
+            "length": steps,
         })
 
         if not result.get("success", False) and "error" in result:
             return f"Error: {result['error']}"
 
         channel_name = result.get("channel_name", f"Channel {channel}")
-        active_steps = result.get("active_steps", sum(pattern))
-        total_steps = result.get("total_steps", len(pattern))
-        return f"Channel '{channel_name}' pattern set with {active_steps}/{total_steps} steps active"
+        active_steps = result.get("active_steps", mask.bit_count())
+        total_steps = result.get("total_steps", steps)
+        return (
+            f"Channel '{channel_name}' pattern set with {active_steps}/{total_steps} steps active"
+        )
+
+    @mcp.tool()
+    async def fl_set_step_sequence(channel: int, pattern_mask: int, steps: int = 16) -> str:
+        """Set a complete step sequence pattern for a channel from a bitmask.
+
+        Bit i of pattern_mask turns step i on, e.g. 0x1111 puts kicks on
+        steps 0, 4, 8 and 12. Steps above `steps` are ignored.
+
+        Args:
+            channel: Channel index (global)
+            pattern_mask: Bitmask of active steps (bit 0 = first step)
+            steps: Number of steps to write, 0-64 (default 16)
+        """
+        return await _set_step_sequence(channel, pattern_mask, steps)
+
+    @mcp.tool()
+    async def fl_set_step_sequence_list(channel: int, pattern: list[bool]) -> str:
+        """Set a complete step sequence pattern for a channel from a list.
+
+        Args:
+            channel: Channel index (global)
+            pattern: List of boolean values for each step (True = on, False = off),
+                     at most 64 steps; an empty list changes nothing
+        """
+        mask = sum(1 << i for i, value in enumerate(pattern) if value)
+        return await _set_step_sequence(channel, mask, len(pattern))
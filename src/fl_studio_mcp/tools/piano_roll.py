@@ -6,114 +6,314 @@ tools create persistent notes by communicating with FL Studio's Piano Roll
 scripting API via JSON files.
 
 Communication flow:
-1. MCP server writes requests to mcp_request.json
+1. MCP server appends requests to mcp_request.json (JSON Lines: one request per line)
 2. Keystroke trigger (Cmd+Opt+Y) executes FL Studio's ComposeWithLLM script
-3. Script reads JSON, modifies piano roll, exports state to piano_roll_state.json
+3. Script reads the queue, modifies piano roll, exports state to piano_roll_state.json
+
+The files stay JSON: piano roll scripts run in FL Studio's embedded
+interpreter, which has the json module but no third-party packages.
 """
 
 from __future__ import annotations
 
+import functools
 import json
 import os
-import platform
+import threading
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Callable, Iterator
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from fl_studio_mcp.tools._helpers import check
+from fl_studio_mcp.utils.fl_paths import get_fl_settings_dir
+from fl_studio_mcp.utils.fl_trigger import get_trigger, trigger_fl_studio
 
 if TYPE_CHECKING:
     from fastmcp import FastMCP
 
+    from fl_studio_mcp.utils.fl_trigger import FLStudioTrigger
 
-def _get_fl_scripts_dir() -> Path:
-    """Get the FL Studio Piano Roll scripts directory."""
-    system = platform.system()
+# Quiet period before a queued auto-trigger fires, so a run of tool calls
+# reaches FL Studio as one keystroke
+_TRIGGER_DEBOUNCE = 0.05
 
-    if system == "Darwin":
-        base = Path.home() / "Documents" / "Image-Line" / "FL Studio" / "Settings"
-    elif system == "Windows":
-        base = Path.home() / "Documents" / "Image-Line" / "FL Studio" / "Settings"
-    else:
-        # Linux fallback (FL Studio doesn't officially support Linux)
-        base = Path.home() / ".fl-studio" / "Settings"
+_trigger_timer: threading.Timer | None = None
+_trigger_lock = threading.Lock()
+
+# Held across every keystroke send, so a scheduled and an immediate trigger
+# never overlap
+_send_lock = threading.Lock()
+
+# Result of the last debounced trigger (None until one has fired)
+_last_auto_trigger_ok: bool | None = None
+
+# Serializes queue writes from this process; fcntl.flock covers other processes
+_queue_lock = threading.Lock()
 
-    scripts_dir = base / "Piano roll scripts"
+# ((st_mtime_ns, st_size), parsed state) of the last state file read
+_state_cache: tuple[tuple[int, int], dict] | None = None
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def _loads(data: bytes) -> Any:
+    """Parse JSON bytes, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+@functools.cache
+def _get_fl_scripts_dir() -> Path:
+    """Get the FL Studio Piano Roll scripts directory (created on first use)."""
+    scripts_dir = get_fl_settings_dir() / "Piano roll scripts"
     scripts_dir.mkdir(parents=True, exist_ok=True)
     return scripts_dir
 
 
+@functools.cache
 def _get_request_file() -> Path:
     """Get the path to the MCP request JSON file."""
     return _get_fl_scripts_dir() / "mcp_request.json"
 
 
+@functools.cache
 def _get_response_file() -> Path:
     """Get the path to the MCP response JSON file."""
     return _get_fl_scripts_dir() / "mcp_response.json"
 
 
+@functools.cache
+def _get_done_file() -> Path:
+    """Get the path to the marker file ComposeWithLLM rewrites when it finishes."""
+    return _get_fl_scripts_dir() / "mcp_done"
+
+
+@functools.cache
 def _get_state_file() -> Path:
     """Get the path to the piano roll state JSON file."""
     return _get_fl_scripts_dir() / "piano_roll_state.json"
 
 
-def _write_request(request: dict | list) -> None:
-    """Write a request to the MCP request file."""
-    request_file = _get_request_file()
+def _write_queue(data: bytes, replace: bool) -> None:
+    """Write JSON Lines to the MCP request queue in one locked write.
 
-    # Read existing requests if any
-    existing = []
-    if request_file.exists():
-        try:
-            with open(request_file) as f:
-                data = json.load(f)
-                if isinstance(data, list):
-                    existing = data
-                elif isinstance(data, dict):
-                    existing = [data]
-        except (json.JSONDecodeError, IOError):
-            existing = []
-
-    # Append new request(s)
-    if isinstance(request, list):
-        existing.extend(request)
-    else:
-        existing.append(request)
+    The exclusive lock keeps concurrent writers from interleaving. ComposeWithLLM
+    renames the queue away under the same lock before reading it, so it never
+    sees a half-written file either. A write that waited on the lock while the
+    queue was renamed reopens the new queue rather than appending to the
+    renamed one.
+    """
+    path = _get_request_file()
+    with _queue_lock:
+        while True:
+            with open(path, "ab", buffering=65536) as f:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                    try:
+                        if os.fstat(f.fileno()).st_ino != os.stat(path).st_ino:
+                            continue
+                    except FileNotFoundError:
+                        continue
+                if replace:
+                    f.truncate(0)
+                f.write(data)
+                return
+
+
+def _append_request(request: dict) -> None:
+    """Append a request to the MCP request queue.
+
+    The queue is JSON Lines, so queuing never rereads what is already there.
+    """
+    _write_queue(_dumps(request) + b"\n", replace=False)
 
-    # Write back
-    with open(request_file, "w") as f:
-        json.dump(existing, f, indent=2)
+
+def _replace_requests(requests: list[dict]) -> None:
+    """Replace everything waiting in the MCP request queue with ``requests``.
+
+    For requests that start by clearing the piano roll, which makes anything
+    queued before them moot.
+    """
+    _write_queue(b"".join(_dumps(r) + b"\n" for r in requests), replace=True)
+
+
+def _read_queue() -> Iterator[dict]:
+    """Yield the requests currently waiting in the MCP request queue.
+
+    Stops at the first line that isn't a JSON request object (e.g. a leftover
+    JSON array written by an older server).
+    """
+    try:
+        with open(_get_request_file(), "rb", buffering=65536) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                request = _loads(line)
+                if not isinstance(request, dict):
+                    return
+                yield request
+    except (FileNotFoundError, json.JSONDecodeError):
+        return
 
 
 def _clear_request_file() -> None:
-    """Clear the request file."""
-    request_file = _get_request_file()
-    if request_file.exists():
-        request_file.unlink()
+    """Clear the request file, and any queue ComposeWithLLM took but hasn't finished."""
+    _write_queue(b"", replace=True)
+    try:
+        os.remove(_get_request_file().with_name("mcp_request.json.processing"))
+    except FileNotFoundError:
+        pass
 
 
 def _read_state() -> dict | None:
-    """Read the current piano roll state."""
+    """Read the current piano roll state.
+
+    The file is only reparsed when its modification time or size changes;
+    otherwise the previous result is returned, so callers must not mutate it.
+    """
+    global _state_cache
     state_file = _get_state_file()
-    if not state_file.exists():
+    try:
+        st = os.stat(state_file)
+    except OSError:
         return None
 
+    key = (st.st_mtime_ns, st.st_size)
+    if _state_cache is not None and _state_cache[0] == key:
+        return _state_cache[1]
+
     try:
-        with open(state_file) as f:
-            return json.load(f)
+        with open(state_file, "rb") as f:
+            state = _loads(f.read())
     except (json.JSONDecodeError, IOError):
         return None
 
+    _state_cache = (key, state)
+    return state
+
+
+_PITCH_CLASSES = ("C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B")
+
+# Name of every MIDI note, e.g. _NOTE_NAMES[60] == "C4"
+_NOTE_NAMES = tuple(f"{_PITCH_CLASSES[m % 12]}{(m // 12) - 1}" for m in range(128))
+
 
 def _midi_to_note_name(midi: int) -> str:
     """Convert MIDI note number to note name."""
-    note_names = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
-    note_name = note_names[midi % 12]
-    octave = (midi // 12) - 1
-    return f"{note_name}{octave}"
+    if 0 <= midi < 128:
+        return _NOTE_NAMES[midi]
+    return f"{_PITCH_CLASSES[midi % 12]}{(midi // 12) - 1}"
+
+
+def _schedule_trigger() -> None:
+    """(Re)arm the debounce timer that triggers FL Studio."""
+    global _trigger_timer
+    with _trigger_lock:
+        if _trigger_timer is not None:
+            _trigger_timer.cancel()
+        _trigger_timer = threading.Timer(_TRIGGER_DEBOUNCE, _fire_scheduled_trigger)
+        _trigger_timer.daemon = True
+        _trigger_timer.start()
+
+
+def _fire_scheduled_trigger() -> None:
+    """Timer callback: send the keystroke for everything queued so far."""
+    global _trigger_timer, _last_auto_trigger_ok
+    with _send_lock:
+        with _trigger_lock:
+            # Cancelled or re-armed while this callback waited for the send lock
+            if _trigger_timer is not threading.current_thread():
+                return
+            _trigger_timer = None
+        _last_auto_trigger_ok = trigger_fl_studio(wait_for=_get_done_file())
+
+
+def _cancel_scheduled_trigger() -> None:
+    """Drop a pending auto-trigger (the caller is about to trigger, or not at all)."""
+    global _trigger_timer
+    with _trigger_lock:
+        if _trigger_timer is not None:
+            _trigger_timer.cancel()
+            _trigger_timer = None
+
+
+def _has_queued_requests() -> bool:
+    """Check whether anything is waiting in the MCP request queue."""
+    try:
+        return _get_request_file().stat().st_size > 0
+    except FileNotFoundError:
+        return False
+
+
+def _trigger_now(trigger: FLStudioTrigger) -> str:
+    """Trigger FL Studio immediately, replacing any scheduled trigger."""
+    if not trigger.is_supported:
+        return f"Error: Auto-trigger not supported on {trigger.platform}"
+
+    waited = not _send_lock.acquire(blocking=False)
+    if waited:
+        _send_lock.acquire()
+    try:
+        _cancel_scheduled_trigger()
+        if waited and _last_auto_trigger_ok and not _has_queued_requests():
+            # A scheduled trigger just ran and covered everything queued
+            success = True
+        else:
+            success = trigger.trigger(wait_for=_get_done_file())
+    finally:
+        _send_lock.release()
+
+    if success:
+        return "FL Studio triggered successfully. Notes should now appear in the piano roll."
+    else:
+        return f"Failed to trigger FL Studio. Try pressing {trigger.keystroke} manually."
+
+
+def _make_maybe_trigger(trigger: FLStudioTrigger) -> Callable[[bool], str]:
+    """Build the tools' auto-trigger step for this platform.
+
+    The returned function schedules an FL Studio trigger if requested and
+    returns a note to append to the tool's reply. Platform support is fixed,
+    so it is checked once here rather than on every call.
+    """
+    if not trigger.is_supported:
+        unsupported = (
+            f" Auto-trigger not supported on {trigger.platform}. Press the trigger key manually."
+        )
+
+        def maybe_trigger(auto_trigger: bool) -> str:
+            return unsupported if auto_trigger else ""
+
+        return maybe_trigger
+
+    def maybe_trigger(auto_trigger: bool) -> str:
+        if not auto_trigger:
+            return ""
+        _schedule_trigger()
+        return " FL Studio will be triggered shortly."
+
+    return maybe_trigger
 
 
 def register_piano_roll_tools(mcp: FastMCP) -> None:
     """Register piano roll tools with the MCP server."""
-    from fl_studio_mcp.utils.fl_trigger import get_trigger, trigger_fl_studio
+    trigger = get_trigger()
+    maybe_trigger = _make_maybe_trigger(trigger)
 
     @mcp.tool()
     def fl_send_notes(
@@ -146,43 +346,28 @@ def register_piano_roll_tools(mcp: FastMCP) -> None:
         if not notes:
             return "Error: No notes provided"
 
-        # Validate notes
-        for i, note in enumerate(notes):
-            if "midi" not in note:
-                return f"Error: Note {i} missing 'midi' field"
-            if "duration" not in note:
-                return f"Error: Note {i} missing 'duration' field"
-
-            # Set defaults
-            note.setdefault("time", 0)
-            note.setdefault("velocity", 0.8)
-
-        requests = []
+        # Validate notes and fill in defaults
+        try:
+            notes = [
+                {
+                    "midi": n["midi"],
+                    "duration": n["duration"],
+                    "time": n.get("time", 0),
+                    "velocity": n.get("velocity", 0.8),
+                }
+                for n in notes
+            ]
+        except KeyError as e:
+            index = next(i for i, n in enumerate(notes) if e.args[0] not in n)
+            return f"Error: Note {index} missing {e} field"
 
-        # If replace mode, clear first
+        # Replace mode clears first, which supersedes anything still queued
         if mode == "replace":
-            requests.append({"action": "clear"})
+            _replace_requests([{"action": "replace_notes", "notes": notes}])
+        else:
+            _append_request({"action": "add_notes", "notes": notes})
 
-        # Add notes request
-        requests.append({
-            "action": "add_notes",
-            "notes": notes
-        })
-
-        _write_request(requests)
-
-        # Trigger FL Studio if requested
-        trigger_info = ""
-        if auto_trigger:
-            trigger = get_trigger()
-            if trigger.is_supported:
-                success = trigger_fl_studio()
-                if success:
-                    trigger_info = " FL Studio triggered successfully."
-                else:
-                    trigger_info = f" Warning: Could not trigger FL Studio. Press {trigger.keystroke} manually."
-            else:
-                trigger_info = f" Auto-trigger not supported on {trigger.platform}. Press the trigger key manually."
+        trigger_info = maybe_trigger(auto_trigger)
 
         note_count = len(notes)
         note_summary = ", ".join(
@@ -236,18 +421,9 @@ def register_piano_roll_tools(mcp: FastMCP) -> None:
             "notes": chord_notes
         }
 
-        _write_request(request)
+        _append_request(request)
 
-        # Trigger FL Studio if requested
-        trigger_info = ""
-        if auto_trigger:
-            trigger = get_trigger()
-            if trigger.is_supported:
-                success = trigger_fl_studio()
-                if success:
-                    trigger_info = " FL Studio triggered successfully."
-                else:
-                    trigger_info = f" Warning: Could not trigger FL Studio. Press {trigger.keystroke} manually."
+        trigger_info = maybe_trigger(auto_trigger)
 
         note_names = ", ".join(_midi_to_note_name(n) for n in midi_notes)
         return f"Queued chord [{note_names}] at beat {time}, duration {duration}.{trigger_info}"
@@ -275,17 +451,9 @@ def register_piano_roll_tools(mcp: FastMCP) -> None:
             "action": "delete_notes",
             "notes": notes
         }
-        _write_request(request)
-
-        trigger_info = ""
-        if auto_trigger:
-            trigger = get_trigger()
-            if trigger.is_supported:
-                success = trigger_fl_studio()
-                if success:
-                    trigger_info = " FL Studio triggered successfully."
-                else:
-                    trigger_info = f" Warning: Could not trigger FL Studio. Press {trigger.keystroke} manually."
+        _append_request(request)
+
+        trigger_info = maybe_trigger(auto_trigger)
 
         return f"Queued deletion of {len(notes)} note(s).{trigger_info}"
 
@@ -296,32 +464,33 @@ def register_piano_roll_tools(mcp: FastMCP) -> None:
         Args:
             auto_trigger: Whether to automatically trigger FL Studio
         """
-        request = {"action": "clear"}
-        _write_request(request)
-
-        trigger_info = ""
-        if auto_trigger:
-            trigger = get_trigger()
-            if trigger.is_supported:
-                success = trigger_fl_studio()
-                if success:
-                    trigger_info = " FL Studio triggered successfully."
-                else:
-                    trigger_info = f" Warning: Could not trigger FL Studio. Press {trigger.keystroke} manually."
+        _replace_requests([{"action": "clear"}])
+
+        trigger_info = maybe_trigger(auto_trigger)
 
         return f"Queued clear all notes.{trigger_info}"
 
     @mcp.tool()
-    def fl_get_piano_roll_state() -> dict:
+    def fl_get_piano_roll_state(offset: int = 0, limit: int | None = None) -> dict:
         """Get the current state of notes in the FL Studio piano roll.
 
         Returns a dictionary containing:
         - ppq: Pulses per quarter note (ticks per beat)
-        - notes: List of all notes with their properties
+        - noteCount: Total number of notes in the piano roll
+        - notes: List of notes with their properties (the requested page only)
+
+        Args:
+            offset: Index of the first note to return (default 0)
+            limit: Maximum number of notes to return (default: all). Use with
+                   offset to page through very large patterns.
 
         Note: This reads from the last exported state. Trigger FL Studio
         (Cmd+Opt+Y on macOS) to refresh the state file after making changes.
         """
+        error = check("offset", offset) or (limit is not None and check("limit", limit))
+        if error:
+            return {"error": error}
+
         state = _read_state()
 
         if state is None:
@@ -332,9 +501,13 @@ def register_piano_roll_tools(mcp: FastMCP) -> None:
 
         # Add human-readable note names
         if "notes" in state:
-            for note in state["notes"]:
-                if "midi" in note:
-                    note["note_name"] = _midi_to_note_name(note["midi"])
+            notes = state["notes"]
+            if offset or limit is not None:
+                notes = notes[offset:None if limit is None else offset + limit]
+            state = {**state, "notes": [
+                {**n, "note_name": _midi_to_note_name(n["midi"])} if "midi" in n else n
+                for n in notes
+            ]}
 
         return state
 
@@ -344,6 +517,7 @@ def register_piano_roll_tools(mcp: FastMCP) -> None:
 
         Use this if you want to cancel queued changes before triggering FL Studio.
         """
+        _cancel_scheduled_trigger()
         _clear_request_file()
         return "Request queue cleared."
 
@@ -353,18 +527,12 @@ def register_piano_roll_tools(mcp: FastMCP) -> None:
 
         This sends the keystroke (Cmd+Opt+Y on macOS, Ctrl+Alt+Y on Windows)
         to FL Studio to execute the ComposeWithLLM piano roll script.
-        """
-        trigger = get_trigger()
-
-        if not trigger.is_supported:
-            return f"Error: Auto-trigger not supported on {trigger.platform}"
 
-        success = trigger_fl_studio()
-
-        if success:
-            return "FL Studio triggered successfully. Notes should now appear in the piano roll."
-        else:
-            return f"Failed to trigger FL Studio. Try pressing {trigger.keystroke} manually."
+        Auto-triggered tool calls are debounced briefly so that a run of calls
+        triggers FL Studio once. Call this to skip the wait, or after queuing
+        changes with auto_trigger=False.
+        """
+        return _trigger_now(trigger)
 
     @mcp.tool()
     def fl_get_piano_roll_info() -> dict:
@@ -372,15 +540,15 @@ def register_piano_roll_tools(mcp: FastMCP) -> None:
 
         Returns platform info, file paths, and whether auto-triggering is supported.
         """
-        trigger = get_trigger()
-
         return {
             "platform": trigger.platform,
             "auto_trigger_supported": trigger.is_supported,
             "trigger_keystroke": trigger.keystroke,
+            "last_auto_trigger_ok": _last_auto_trigger_ok,
             "scripts_dir": str(_get_fl_scripts_dir()),
             "request_file": str(_get_request_file()),
             "state_file": str(_get_state_file()),
             "request_file_exists": _get_request_file().exists(),
+            "pending_requests": sum(1 for _ in _read_queue()),
             "state_file_exists": _get_state_file().exists(),
         }
@@ -16,6 +16,8 @@ def register_plugin_tools(mcp: FastMCP) -> None:
     """Register plugin control tools with the MCP server."""
     from fl_studio_mcp.utils.connection import get_connection
 
+    conn = get_connection()
+
     @mcp.tool()
     def fl_is_plugin_valid(
         index: int,
@@ -32,7 +34,6 @@ def register_plugin_tools(mcp: FastMCP) -> None:
             slot_index: Effect slot index for mixer plugins (-1 for channel rack)
             use_global_index: Whether to use global channel indexing
         """
-        conn = get_connection()
         result = conn.send_command("plugins.isValid", {
             "index": index,
             "slot_index": slot_index,
@@ -57,7 +58,6 @@ def register_plugin_tools(mcp: FastMCP) -> None:
             slot_index: Effect slot index for mixer plugins (-1 for channel rack)
             use_global_index: Whether to use global channel indexing
         """
-        conn = get_connection()
         result = conn.send_command("plugins.getName", {
             "index": index,
             "slot_index": slot_index,
@@ -82,7 +82,6 @@ def register_plugin_tools(mcp: FastMCP) -> None:
             slot_index: Effect slot index for mixer plugins (-1 for channel rack)
             use_global_index: Whether to use global channel indexing
         """
-        conn = get_connection()
         result = conn.send_command("plugins.getParamCount", {
             "index": index,
             "slot_index": slot_index,
@@ -109,7 +108,6 @@ def register_plugin_tools(mcp: FastMCP) -> None:
             use_global_index: Whether to use global channel indexing
             max_params: Maximum number of parameters to return (default 50)
         """
-        conn = get_connection()
         result = conn.send_command("plugins.getParams", {
             "index": index,
             "slot_index": slot_index,
@@ -137,7 +135,6 @@ def register_plugin_tools(mcp: FastMCP) -> None:
             slot_index: Effect slot index for mixer plugins (-1 for channel rack)
             use_global_index: Whether to use global channel indexing
         """
-        conn = get_connection()
         result = conn.send_command("plugins.getParamValue", {
             "param_index": param_index,
             "plugin_index": plugin_index,
@@ -172,7 +169,6 @@ def register_plugin_tools(mcp: FastMCP) -> None:
             slot_index: Effect slot index for mixer plugins (-1 for channel rack)
             use_global_index: Whether to use global channel indexing
         """
-        conn = get_connection()
         result = conn.send_command("plugins.setParamValue", {
             "param_index": param_index,
             "value": value,
@@ -202,7 +198,6 @@ def register_plugin_tools(mcp: FastMCP) -> None:
             slot_index: Effect slot index for mixer plugins (-1 for channel rack)
             use_global_index: Whether to use global channel indexing
         """
-        conn = get_connection()
         result = conn.send_command("plugins.getPresetCount", {
             "index": index,
             "slot_index": slot_index,
@@ -227,7 +222,6 @@ def register_plugin_tools(mcp: FastMCP) -> None:
             slot_index: Effect slot index for mixer plugins (-1 for channel rack)
             use_global_index: Whether to use global channel indexing
         """
-        conn = get_connection()
         result = conn.send_command("plugins.nextPreset", {
             "index": index,
             "slot_index": slot_index,
@@ -253,7 +247,6 @@ def register_plugin_tools(mcp: FastMCP) -> None:
             slot_index: Effect slot index for mixer plugins (-1 for channel rack)
             use_global_index: Whether to use global channel indexing
         """
-        conn = get_connection()
         result = conn.send_command("plugins.prevPreset", {
             "index": index,
             "slot_index": slot_index,
@@ -279,7 +272,6 @@ def register_plugin_tools(mcp: FastMCP) -> None:
             slot_index: Effect slot index for mixer plugins (-1 for channel rack)
             use_global_index: Whether to use global channel indexing
         """
-        conn = get_connection()
         result = conn.send_command("plugins.getColor", {
             "index": index,
             "slot_index": slot_index,
@@ -290,3 +282,48 @@ def register_plugin_tools(mcp: FastMCP) -> None:
             return f"Error: {result['error']}"
 
         return result.get("color", "0x0")
+
+    @mcp.tool()
+    def fl_get_plugin_summary(
+        index: int,
+        slot_index: int = -1,
+        use_global_index: bool = True
+    ) -> dict:
+        """Get a plugin's name, parameter count and color in a single round-trip.
+
+        Equivalent to calling fl_is_plugin_valid, fl_get_plugin_name,
+        fl_get_plugin_param_count and fl_get_plugin_color, but FL Studio
+        answers all four at once.
+
+        Args:
+            index: Channel index (global) or mixer track index
+            slot_index: Effect slot index for mixer plugins (-1 for channel rack)
+            use_global_index: Whether to use global channel indexing
+        """
+        params = {
+            "index": index,
+            "slot_index": slot_index,
+            "use_global": use_global_index,
+        }
+        valid, name, count, color = conn.send_batch([
+            ("plugins.isValid", params),
+            ("plugins.getName", params),
+            ("plugins.getParamCount", params),
+            ("plugins.getColor", params),
+        ])
+
+        if not valid.get("success", False) and "error" in valid:
+            return {"error": valid["error"]}
+        if not valid.get("valid", False):
+            return {"valid": False}
+
+        for result in (name, count, color):
+            if not result.get("success", False) and "error" in result:
+                return {"valid": True, "error": result["error"]}
+
+        return {
+            "valid": True,
+            "name": name.get("name", ""),
+            "param_count": count.get("count", 0),
+            "color": color.get("color", "0x0"),
+        }
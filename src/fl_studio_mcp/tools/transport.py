@@ -10,8 +10,11 @@ if TYPE_CHECKING:
 
 def register_transport_tools(mcp: FastMCP) -> None:
     """Register transport control tools with the MCP server."""
+    from fl_studio_mcp.tools._helpers import check
     from fl_studio_mcp.utils.connection import get_connection
 
+    conn = get_connection()
+
     @mcp.tool()
     def fl_play() -> str:
         """Start or pause FL Studio playback.
@@ -19,7 +22,6 @@ def register_transport_tools(mcp: FastMCP) -> None:
         Toggles between play and pause states. If stopped, starts playback.
         If playing, pauses playback.
         """
-        conn = get_connection()
         result = conn.send_command("transport.start")
 
         if not result.get("success", False) and "error" in result:
@@ -34,7 +36,6 @@ def register_transport_tools(mcp: FastMCP) -> None:
 
         Stops playback and resets the playback position.
         """
-        conn = get_connection()
         result = conn.send_command("transport.stop")
 
         if not result.get("success", False) and "error" in result:
@@ -48,7 +49,6 @@ def register_transport_tools(mcp: FastMCP) -> None:
 
         When enabled, incoming MIDI and audio will be recorded.
         """
-        conn = get_connection()
         result = conn.send_command("transport.record")
 
         if not result.get("success", False) and "error" in result:
@@ -64,7 +64,6 @@ def register_transport_tools(mcp: FastMCP) -> None:
         Returns information about whether FL Studio is playing, recording,
         the current position, and loop mode.
         """
-        conn = get_connection()
         result = conn.send_command("transport.getStatus")
 
         if not result.get("success", False) and "error" in result:
@@ -90,7 +89,6 @@ def register_transport_tools(mcp: FastMCP) -> None:
                   3 = Position in ticks
                   4 = Position as bars:steps:ticks (encoded)
         """
-        conn = get_connection()
         result = conn.send_command("transport.setPosition", {
             "position": position,
             "mode": mode,
@@ -108,7 +106,6 @@ def register_transport_tools(mcp: FastMCP) -> None:
 
         Returns the length in multiple formats for convenience.
         """
-        conn = get_connection()
         result = conn.send_command("transport.getLength")
 
         if not result.get("success", False) and "error" in result:
@@ -127,7 +124,6 @@ def register_transport_tools(mcp: FastMCP) -> None:
         Args:
             mode: Either "pattern" or "song"
         """
-        conn = get_connection()
         result = conn.send_command("transport.setLoopMode", {"mode": mode})
 
         if not result.get("success", False) and "error" in result:
@@ -143,10 +139,10 @@ def register_transport_tools(mcp: FastMCP) -> None:
             speed: Speed multiplier from 0.25 (quarter speed) to 4.0 (4x speed).
                    1.0 is normal speed.
         """
-        if not 0.25 <= speed <= 4.0:
-            return "Error: Speed must be between 0.25 and 4.0"
+        error = check("speed", speed)
+        if error:
+            return error
 
-        conn = get_connection()
         result = conn.send_command("transport.setPlaybackSpeed", {"speed": speed})
 
         if not result.get("success", False) and "error" in result:
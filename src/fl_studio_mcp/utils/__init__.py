@@ -1,9 +1,15 @@
 """FL Studio MCP utilities."""
 
-from fl_studio_mcp.utils.connection import FLConnection, get_connection, reset_connection
+from fl_studio_mcp.utils.connection import (
+    CommandPipeline,
+    FLConnection,
+    get_connection,
+    reset_connection,
+)
 from fl_studio_mcp.utils.fl_trigger import FLStudioTrigger, get_trigger, trigger_fl_studio
 
 __all__ = [
+    "CommandPipeline",
     "FLConnection",
     "get_connection",
     "reset_connection",
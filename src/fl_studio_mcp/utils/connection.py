@@ -9,17 +9,86 @@ The communication flow is:
 3. FL Studio controller script executes the command
 4. FL Studio controller writes response to JSON file
 5. MCP server reads response
+
+FL Studio handles one command at a time, so commands are queued and sent by a
+single worker thread. Async tools await the queued command instead of blocking
+the server's event loop while FL Studio responds.
+
+Read-only metadata queries are cached for a few seconds; any other command in
+the same family (e.g. "mixer.setTrackName" for "mixer.getAllTracks") drops
+the family's cached results.
+
+With FL_MCP_COALESCE=1, volume/pan setters are held for a short window and
+only the last value per track/channel is sent; see _COALESCED_SETTERS.
+
+The transport status behind the fl://project resource is refreshed by a
+background thread while it is being read, so reads don't wait on FL Studio.
 """
 
 from __future__ import annotations
 
-from typing import Any
+import asyncio
+import atexit
+import contextlib
+import functools
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Iterator
 
 from fl_studio_mcp.utils.midi_connection import (
     get_connection as get_midi_connection,
     reset_connection as reset_midi_connection,
 )
 
+# Cacheable read-only commands and how long (seconds) their results stay valid
+_CACHE_TTLS: dict[str, float] = {
+    "mixer.getTrackCount": math.inf,
+    "mixer.getTrackInfo": 5.0,
+    "mixer.getAllTracks": 5.0,
+    "channels.getCount": 5.0,
+    "channels.getInfo": 5.0,
+    "channels.getAll": 5.0,
+}
+_CACHE_FAMILIES = frozenset(action.partition(".")[0] for action in _CACHE_TTLS)
+
+# Setters that may be coalesced (action -> param naming the target) and how
+# long (seconds) they are held waiting for a newer value. Opt-in because the
+# caller gets a synthetic success instead of FL Studio's reply.
+_COALESCED_SETTERS: dict[str, str] = {
+    "mixer.setTrackVolume": "track",
+    "mixer.setTrackPan": "track",
+    "channels.setVolume": "index",
+    "channels.setPan": "index",
+}
+_COALESCE_WINDOW = 0.015
+
+# Transport status refresh interval, and how long (seconds) refreshing keeps
+# going after the last read
+_HEALTH_INTERVAL = 0.5
+_HEALTH_IDLE_AFTER = 5.0
+
+
+class CommandPipeline:
+    """Commands collected inside FLConnection.pipeline().
+
+    After the with block, results holds one response per command, in order.
+    """
+
+    __slots__ = ("commands", "results")
+
+    def __init__(self) -> None:
+        self.commands: list[tuple[str, dict[str, Any] | None]] = []
+        self.results: list[dict[str, Any]] = []
+
+    def send(self, action: str, params: dict[str, Any] | None = None) -> int:
+        """Add a command to the batch; return its index in results."""
+        self.commands.append((action, params))
+        return len(self.commands) - 1
+
 
 class FLConnection:
     """Wrapper for FL Studio connection via MIDI.
@@ -28,9 +97,52 @@ class FLConnection:
     and receiving responses.
     """
 
+    __slots__ = (
+        "_midi",
+        "_queue",
+        "_ready",
+        "_worker",
+        "_cache",
+        "_cache_versions",
+        "_cache_lock",
+        "_coalesce",
+        "_pending",
+        "_flush_timer",
+        "_status_snapshot",
+        "_status_read",
+        "_health_thread",
+        "_closed",
+    )
+
     def __init__(self) -> None:
         self._midi = get_midi_connection()
 
+        # Pending (MIDIConnection method name, args, future) entries, drained by
+        # the worker thread. The method is looked up when the entry is sent, so
+        # entries queued before a reconnect() go out on the new connection.
+        self._queue: deque[tuple[str, tuple[Any, ...], Future]] = deque()
+        self._ready = threading.Condition()
+        self._worker: threading.Thread | None = None
+
+        # Coalesced setters waiting to be queued: (action, target) -> (params, timeout).
+        # Guarded by _ready, like the queue they are moved into.
+        self._coalesce = os.environ.get("FL_MCP_COALESCE") == "1"
+        self._pending: dict[tuple[str, Any], tuple[dict[str, Any], float]] = {}
+        self._flush_timer: threading.Timer | None = None
+
+        # Latest transport.getStatus response, kept fresh by the health thread
+        self._status_snapshot: dict[str, Any] | None = None
+        self._status_read = 0.0
+        self._health_thread: threading.Thread | None = None
+        self._closed = threading.Event()
+
+        # (action, params) -> (expiry, response) for the commands in _CACHE_TTLS.
+        # A family's version is bumped on invalidation so that responses to
+        # requests sent before it are not stored.
+        self._cache: dict[tuple[str, frozenset], tuple[float, dict[str, Any]]] = {}
+        self._cache_versions: dict[str, int] = {}
+        self._cache_lock = threading.Lock()
+
     def ensure_connected(self) -> None:
         """Ensure connection to FL Studio is active. Raises RuntimeError if not."""
         self._midi.ensure_connected()
@@ -64,27 +176,335 @@ class FLConnection:
         Raises:
             RuntimeError: If not connected or command fails
         """
-        return self._midi.send_command(action, params, timeout)
+        return self.submit(action, params, timeout).result()
+
+    async def send_command_async(
+        self,
+        action: str,
+        params: dict[str, Any] | None = None,
+        timeout: float = 2.0,
+    ) -> dict[str, Any]:
+        """Send a command to FL Studio without blocking the event loop.
+
+        Same arguments and return value as send_command().
+        """
+        return await asyncio.wrap_future(self.submit(action, params, timeout))
+
+    def submit(
+        self,
+        action: str,
+        params: dict[str, Any] | None = None,
+        timeout: float = 2.0,
+    ) -> Future:
+        """Queue a command for FL Studio and return a future for its response.
+
+        Commands are sent in submission order. Cached metadata queries, and
+        coalesced setters, return an already completed future.
+        """
+        if self._coalesce and action in _COALESCED_SETTERS:
+            return self._defer(action, params or {}, timeout)
+
+        ttl = _CACHE_TTLS.get(action)
+        if ttl is None:
+            self._invalidate(action)
+            return self._enqueue("send_command", (action, params, timeout))
+
+        key = (action, frozenset((params or {}).items()))
+        family = action.partition(".")[0]
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                future: Future = Future()
+                future.set_result(entry[1])
+                return future
+            version = self._cache_versions.get(family, 0)
+
+        future = self._enqueue("send_command", (action, params, timeout))
+        future.add_done_callback(lambda f: self._store(key, family, version, ttl, f))
+        return future
+
+    def send_command_futures(
+        self,
+        commands: list[tuple[str, dict[str, Any] | None]],
+        timeout: float = 2.0,
+    ) -> list[Future]:
+        """Queue several independent commands at once; return one future per command.
+
+        The worker sends them back to back, and each future resolves as soon
+        as its own response arrives. Use send_batch() instead when the
+        commands should share a single round-trip.
+        """
+        return [self.submit(action, params, timeout) for action, params in commands]
+
+    def clear_cache(self) -> None:
+        """Drop all cached responses."""
+        with self._cache_lock:
+            for family in _CACHE_FAMILIES:
+                self._cache_versions[family] = self._cache_versions.get(family, 0) + 1
+            self._cache = {}
+
+    def _invalidate(self, action: str) -> None:
+        """Drop cached responses that a command may have made stale.
+
+        Getters never invalidate.
+        """
+        family, _, method = action.partition(".")
+        if method.startswith("get") or family not in _CACHE_FAMILIES:
+            return
+
+        with self._cache_lock:
+            self._cache_versions[family] = self._cache_versions.get(family, 0) + 1
+            self._cache = {
+                key: entry for key, entry in self._cache.items()
+                if key[0].partition(".")[0] != family
+            }
+
+    def _store(
+        self,
+        key: tuple[str, frozenset],
+        family: str,
+        version: int,
+        ttl: float,
+        future: Future,
+    ) -> None:
+        """Cache a successful response unless its family was invalidated meanwhile."""
+        if future.cancelled() or future.exception() is not None:
+            return
+        result = future.result()
+        if not result.get("success", False):
+            return
+        with self._cache_lock:
+            if self._cache_versions.get(family, 0) == version:
+                self._cache[key] = (time.monotonic() + ttl, result)
+
+    def send_batch(
+        self,
+        commands: list[tuple[str, dict[str, Any] | None]],
+        timeout: float = 5.0,
+        linked: bool = False,
+    ) -> list[dict[str, Any]]:
+        """Send several commands to FL Studio in a single round-trip.
+
+        Args:
+            commands: List of (action, params) pairs, executed in order
+            timeout: Maximum time to wait for the whole batch in seconds
+            linked: Stop at the first failing command; later ones are skipped
+
+        Returns:
+            One response dictionary per command, in order
+
+        Raises:
+            RuntimeError: If not connected
+        """
+        return self.submit_batch(commands, timeout, linked).result()
+
+    async def send_batch_async(
+        self,
+        commands: list[tuple[str, dict[str, Any] | None]],
+        timeout: float = 5.0,
+        linked: bool = False,
+    ) -> list[dict[str, Any]]:
+        """Send a batch without blocking the event loop.
+
+        Same arguments and return value as send_batch().
+        """
+        return await asyncio.wrap_future(self.submit_batch(commands, timeout, linked))
+
+    @contextlib.contextmanager
+    def pipeline(self, timeout: float = 5.0, linked: bool = False) -> Iterator[CommandPipeline]:
+        """Collect commands and send them as one batch when the block exits.
+
+        Nothing is sent if the block raises.
+
+        Example:
+            with conn.pipeline() as p:
+                for track in range(1, 9):
+                    p.send("mixer.setTrackVolume", {"track": track, "volume": 0.8})
+            print(p.results)
+        """
+        pipe = CommandPipeline()
+        yield pipe
+        if pipe.commands:
+            pipe.results = self.send_batch(pipe.commands, timeout, linked)
+
+    def submit_batch(
+        self,
+        commands: list[tuple[str, dict[str, Any] | None]],
+        timeout: float = 5.0,
+        linked: bool = False,
+    ) -> Future:
+        """Queue a batch for FL Studio and return a future for its results."""
+        # Each command invalidates what it would on its own, so read-only
+        # batches keep the cache
+        for action in {action for action, _ in commands}:
+            self._invalidate(action)
+        return self._enqueue("send_batch", (commands, timeout, linked))
+
+    def _enqueue(self, method: str, args: tuple[Any, ...]) -> Future:
+        """Add a MIDIConnection call to the command queue, starting the worker if needed.
+
+        Coalesced setters still waiting are queued first, so they keep their
+        order relative to later commands.
+        """
+        future: Future = Future()
+        with self._ready:
+            if self._pending:
+                self._queue_pending()
+            self._queue.append((method, args, future))
+            self._start_worker()
+            self._ready.notify()
+        return future
+
+    def _defer(self, action: str, params: dict[str, Any], timeout: float) -> Future:
+        """Hold a setter for the coalescing window, replacing any older value.
+
+        Returns a completed future with a synthetic success response.
+        """
+        self._invalidate(action)
+        key = (action, params.get(_COALESCED_SETTERS[action]))
+        with self._ready:
+            self._pending[key] = (params, timeout)
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(_COALESCE_WINDOW, self._flush_pending)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+        future: Future = Future()
+        future.set_result({"success": True, **params})
+        return future
+
+    def _flush_pending(self) -> None:
+        """Timer callback: queue the coalesced setters."""
+        with self._ready:
+            if self._pending:
+                self._queue_pending()
+                self._start_worker()
+                self._ready.notify()
+
+    def _queue_pending(self) -> None:
+        """Move coalesced setters into the command queue. Caller holds _ready."""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        for (action, _), (params, timeout) in self._pending.items():
+            # Nobody waits on these; FL Studio's reply is dropped
+            self._queue.append(("send_command", (action, params, timeout), Future()))
+        self._pending.clear()
+
+    def _start_worker(self) -> None:
+        """Start the worker thread if it isn't running. Caller holds _ready."""
+        if self._worker is None:
+            self._worker = threading.Thread(
+                target=self._run_queue, name="fl-studio-commands", daemon=True
+            )
+            self._worker.start()
+
+    def _run_queue(self) -> None:
+        """Worker loop: send queued commands to FL Studio one at a time."""
+        while True:
+            with self._ready:
+                while not self._queue:
+                    if self._closed.is_set():
+                        return
+                    self._ready.wait()
+                method, args, future = self._queue.popleft()
+
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(getattr(self._midi, method)(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def send_raw_midi(self, status: int, data1: int, data2: int) -> dict[str, Any] | None:
+        """Send a 3-byte MIDI message straight to FL Studio, without a response.
+
+        The message skips the command queue and the controller script, and
+        FL Studio handles it like any other incoming MIDI event.
+
+        Returns:
+            An error dict on failure, None on success
+
+        Raises:
+            RuntimeError: If not connected
+        """
+        return self._midi.send_raw_midi(status, data1, data2)
 
     def get_status(self) -> dict[str, Any]:
         """Get connection status information."""
         return self._midi.get_status()
 
+    def get_transport_status(self) -> dict[str, Any]:
+        """Get the latest transport.getStatus response.
+
+        The first read starts a background thread that refreshes the response
+        every 0.5 s for as long as it keeps being read; until that has a
+        result, the read sends the command itself.
+
+        Raises:
+            RuntimeError: If not connected
+        """
+        self._status_read = time.monotonic()
+        with self._ready:
+            if self._health_thread is None:
+                self._health_thread = threading.Thread(
+                    target=self._run_health_check, name="fl-studio-health", daemon=True
+                )
+                self._health_thread.start()
+
+        snapshot = self._status_snapshot
+        if snapshot is None:
+            snapshot = self._refresh_status()
+        return dict(snapshot)
 
-# Global connection instance
-_connection: FLConnection | None = None
+    def reconnect(self) -> None:
+        """Drop the MIDI connection and cached state so the next command reconnects."""
+        reset_midi_connection()
+        self._midi = get_midi_connection()
+        self._status_snapshot = None
+        self.clear_cache()
+
+    def close(self) -> None:
+        """Stop the background threads once they are idle; registered to run at exit."""
+        self._closed.set()
+        with self._ready:
+            self._ready.notify_all()
+
+    def _refresh_status(self) -> dict[str, Any]:
+        snapshot = self.send_command("transport.getStatus")
+        self._status_snapshot = snapshot
+        return snapshot
 
+    def _run_health_check(self) -> None:
+        """Health thread loop: refresh the transport status while it is in use."""
+        while not self._closed.wait(_HEALTH_INTERVAL):
+            if time.monotonic() - self._status_read > _HEALTH_IDLE_AFTER:
+                # Nobody is reading; let the next read fetch a fresh status
+                self._status_snapshot = None
+                continue
+            if not self._midi.is_connected:
+                continue
+            try:
+                self._refresh_status()
+            except Exception:
+                self._status_snapshot = None
 
+
+@functools.cache
 def get_connection() -> FLConnection:
     """Get the global FL Studio connection instance."""
-    global _connection
-    if _connection is None:
-        _connection = FLConnection()
-    return _connection
+    connection = FLConnection()
+    atexit.register(connection.close)
+    return connection
 
 
 def reset_connection() -> None:
-    """Reset the connection state to allow reconnection attempts."""
-    global _connection
-    reset_midi_connection()
-    _connection = None
+    """Reset the connection state to allow reconnection attempts.
+
+    The FLConnection instance itself is kept (tool modules bind it at
+    registration); only its MIDI connection and cached responses are replaced.
+    """
+    if get_connection.cache_info().currsize:
+        get_connection().reconnect()
+    else:
+        reset_midi_connection()
@@ -0,0 +1,56 @@
+"""Locate FL Studio's user Settings directory.
+
+FL Studio keeps its user scripts under Documents/Image-Line/FL Studio/Settings.
+On Linux it runs under Wine, so that directory lives inside the Wine prefix.
+Set FL_STUDIO_SETTINGS_DIR to use a different directory on any platform.
+"""
+
+from __future__ import annotations
+
+import functools
+import getpass
+import os
+import sys
+from pathlib import Path
+
+_SETTINGS_SUBDIR = Path("Documents") / "Image-Line" / "FL Studio" / "Settings"
+
+
+@functools.cache
+def get_wine_fl_settings_dir() -> Path | None:
+    """Get FL Studio's Settings directory inside the Wine prefix, if it exists.
+
+    Uses $WINEPREFIX (default ~/.wine) and the current user's Wine profile.
+    """
+    prefix = Path(os.environ.get("WINEPREFIX", "~/.wine")).expanduser()
+    settings = prefix / "drive_c" / "users" / getpass.getuser() / _SETTINGS_SUBDIR
+    return settings if settings.is_dir() else None
+
+
+@functools.cache
+def get_fl_settings_dir() -> Path:
+    """Get FL Studio's Settings directory for this platform."""
+    override = os.environ.get("FL_STUDIO_SETTINGS_DIR")
+    if override:
+        return Path(override).expanduser()
+
+    if sys.platform.startswith("linux"):
+        # FL Studio doesn't officially support Linux; expect it under Wine
+        wine_settings = get_wine_fl_settings_dir()
+        if wine_settings is not None:
+            return wine_settings
+        return Path.home() / ".fl-studio" / "Settings"
+
+    return Path.home() / _SETTINGS_SUBDIR
+
+
+def has_fl_settings_dir() -> bool:
+    """Check whether FL Studio's Settings directory was found (or configured).
+
+    Always True on macOS and Windows. On Linux it is False when no Wine
+    install was found, since ComposeWithLLM would never see the request
+    files written to the fallback directory.
+    """
+    if os.environ.get("FL_STUDIO_SETTINGS_DIR") or not sys.platform.startswith("linux"):
+        return True
+    return get_wine_fl_settings_dir() is not None
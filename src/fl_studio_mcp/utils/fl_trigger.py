@@ -6,24 +6,188 @@ ComposeWithLLM Piano Roll script, which processes JSON note requests.
 
 from __future__ import annotations
 
-import platform
+import functools
+import hashlib
+import os
 import subprocess
+import sys
 import time
-from typing import Callable
+from pathlib import Path
+from typing import Any, Callable
+
+try:
+    # macOS only; installed alongside pynput there
+    import Quartz
+    from AppKit import NSApplicationActivateIgnoringOtherApps, NSWorkspace
+except ImportError:
+    Quartz = None
+
+try:
+    # Linux (FL Studio under Wine on X11); optional python-xlib
+    from Xlib import XK, X
+    from Xlib import display as xdisplay
+    from Xlib.ext import xtest
+except ImportError:
+    xtest = None
+
+from fl_studio_mcp.utils.fl_paths import has_fl_settings_dir
 
 # Delay after triggering to allow FL Studio to process
 TRIGGER_DELAY = 2.0
 
+# platform.system()-style name, derived from the constant sys.platform
+if sys.platform == "darwin":
+    _SYSTEM = "Darwin"
+elif sys.platform in ("win32", "cygwin"):
+    _SYSTEM = "Windows"
+elif sys.platform.startswith("linux"):
+    _SYSTEM = "Linux"
+else:
+    _SYSTEM = sys.platform
+
+_KEYSTROKES = {"Darwin": "Cmd+Opt+Y", "Windows": "Ctrl+Alt+Y", "Linux": "Ctrl+Alt+Y"}
+
+# Polling while waiting for the script's completion marker
+_DONE_POLL_INITIAL = 0.005
+_DONE_POLL_MAX = 0.05
+
+
+def _mtime_ns(path: Path) -> int | None:
+    """Modification time of path in nanoseconds, or None if it doesn't exist."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _wait_for_change(path: Path, before: int | None, timeout: float) -> None:
+    """Wait up to timeout seconds for path's modification time to differ from before."""
+    deadline = time.monotonic() + timeout
+    interval = _DONE_POLL_INITIAL
+    while time.monotonic() < deadline:
+        if _mtime_ns(path) != before:
+            return
+        time.sleep(interval)
+        interval = min(interval * 1.5, _DONE_POLL_MAX)
+
+
+# macOS virtual key code for "y" and the Cmd+Opt modifiers of the trigger keystroke
+_MAC_KEYCODE_Y = 16
+_MAC_TRIGGER_FLAGS = (
+    Quartz.kCGEventFlagMaskCommand | Quartz.kCGEventFlagMaskAlternate if Quartz else 0
+)
+
+# AppleScript fallback for sending the trigger keystroke on macOS
+_MAC_TRIGGER_SCRIPT = '''
+tell application "FL Studio"
+    activate
+end tell
+delay 0.3
+tell application "System Events"
+    keystroke "y" using {command down, option down}
+end tell
+'''
+
+
+@functools.cache
+def _compiled_trigger_script() -> str | None:
+    """Compile _MAC_TRIGGER_SCRIPT with osacompile once; return the .scpt path.
+
+    The file name carries a hash of the script, so an edited script is
+    recompiled. Returns None if compiling fails (osascript -e still works).
+    """
+    digest = hashlib.sha1(_MAC_TRIGGER_SCRIPT.encode()).hexdigest()[:12]
+    path = Path.home() / "Library" / "Caches" / "fl-studio-mcp" / f"trigger-{digest}.scpt"
+    if path.exists():
+        return str(path)
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        subprocess.run(
+            ["osacompile", "-o", str(path), "-e", _MAC_TRIGGER_SCRIPT],
+            capture_output=True,
+            timeout=10,
+            check=True,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return str(path)
+
+
+# Windows virtual key codes for the Ctrl+Alt+Y trigger keystroke
+_VK_CONTROL = 0x11
+_VK_MENU = 0x12
+_VK_Y = 0x59
+
+
+@functools.cache
+def _windows_keystroke_inputs() -> tuple[Any, Any, int]:
+    """Build the SendInput arguments for Ctrl+Alt+Y down and up (Windows only).
+
+    Returns (SendInput, INPUT array, sizeof(INPUT)).
+    """
+    import ctypes
+    from ctypes import wintypes
+
+    class KEYBDINPUT(ctypes.Structure):
+        _fields_ = [
+            ("wVk", wintypes.WORD),
+            ("wScan", wintypes.WORD),
+            ("dwFlags", wintypes.DWORD),
+            ("time", wintypes.DWORD),
+            ("dwExtraInfo", ctypes.c_size_t),
+        ]
+
+    class MOUSEINPUT(ctypes.Structure):
+        # Largest union member; sizes INPUT correctly
+        _fields_ = [
+            ("dx", wintypes.LONG),
+            ("dy", wintypes.LONG),
+            ("mouseData", wintypes.DWORD),
+            ("dwFlags", wintypes.DWORD),
+            ("time", wintypes.DWORD),
+            ("dwExtraInfo", ctypes.c_size_t),
+        ]
+
+    class INPUTUNION(ctypes.Union):
+        _fields_ = [("ki", KEYBDINPUT), ("mi", MOUSEINPUT)]
+
+    class INPUT(ctypes.Structure):
+        _fields_ = [("type", wintypes.DWORD), ("u", INPUTUNION)]
+
+    input_keyboard = 1
+    keyeventf_keyup = 0x0002
+    keys = (_VK_CONTROL, _VK_MENU, _VK_Y)
+    events = [(vk, 0) for vk in keys] + [(vk, keyeventf_keyup) for vk in reversed(keys)]
+
+    inputs = (INPUT * len(events))()
+    for item, (vk, flags) in zip(inputs, events):
+        item.type = input_keyboard
+        item.u.ki = KEYBDINPUT(wVk=vk, dwFlags=flags)
+
+    send_input = ctypes.windll.user32.SendInput
+    send_input.argtypes = (wintypes.UINT, ctypes.c_void_p, ctypes.c_int)
+    send_input.restype = wintypes.UINT
+    return send_input, inputs, ctypes.sizeof(INPUT)
+
+
+def _send_windows_keystroke() -> bool:
+    """Send Ctrl+Alt+Y with a single SendInput call; True if every event went out."""
+    send_input, inputs, size = _windows_keystroke_inputs()
+    return send_input(len(inputs), inputs, size) == len(inputs)
+
 
 class FLStudioTrigger:
     """Handles triggering FL Studio's Piano Roll script via keystrokes.
 
-    The trigger sends Cmd+Opt+Y (macOS) or Ctrl+Alt+Y (Windows) to FL Studio,
-    which executes the ComposeWithLLM.pyscript to process pending JSON requests.
+    The trigger sends Cmd+Opt+Y (macOS) or Ctrl+Alt+Y (Windows, and Linux/X11
+    with python-xlib installed and FL Studio found in the Wine prefix) to FL
+    Studio, which executes the ComposeWithLLM.pyscript to process pending
+    JSON requests.
     """
 
     def __init__(self) -> None:
-        self._system = platform.system()
+        self._system = _SYSTEM
         self._trigger_func: Callable[[], bool] | None = None
         self._setup_trigger()
 
@@ -33,24 +197,62 @@ class FLStudioTrigger:
             self._trigger_func = self._trigger_macos
         elif self._system == "Windows":
             self._trigger_func = self._trigger_windows
+        elif (
+            self._system == "Linux"
+            and xtest is not None
+            and os.environ.get("DISPLAY")
+            and has_fl_settings_dir()
+        ):
+            self._trigger_func = self._trigger_linux
         else:
             self._trigger_func = None
 
     def _trigger_macos(self) -> bool:
+        """Trigger FL Studio on macOS, posting the keystroke directly if possible."""
+        if Quartz is not None:
+            try:
+                if self._trigger_macos_quartz():
+                    return True
+            except Exception:
+                pass
+        return self._trigger_macos_osascript()
+
+    def _trigger_macos_quartz(self) -> bool:
+        """Trigger FL Studio on macOS by posting CoreGraphics key events.
+
+        Avoids spawning osascript for every trigger. Returns False if FL Studio
+        isn't running.
+        """
+        app = next(
+            (
+                a for a in NSWorkspace.sharedWorkspace().runningApplications()
+                if (a.localizedName() or "").startswith("FL Studio")
+            ),
+            None,
+        )
+        if app is None:
+            return False
+
+        if not app.isActive():
+            app.activateWithOptions_(NSApplicationActivateIgnoringOtherApps)
+            time.sleep(0.3)
+
+        # Send Cmd+Opt+Y
+        for key_down in (True, False):
+            event = Quartz.CGEventCreateKeyboardEvent(None, _MAC_KEYCODE_Y, key_down)
+            Quartz.CGEventSetFlags(event, _MAC_TRIGGER_FLAGS)
+            Quartz.CGEventPost(Quartz.kCGHIDEventTap, event)
+
+        return True
+
+    def _trigger_macos_osascript(self) -> bool:
         """Trigger FL Studio on macOS using osascript."""
         try:
-            # Use osascript to send keystroke to FL Studio
-            script = '''
-            tell application "FL Studio"
-                activate
-            end tell
-            delay 0.3
-            tell application "System Events"
-                keystroke "y" using {command down, option down}
-            end tell
-            '''
+            # Run the precompiled script when available; it skips parsing
+            compiled = _compiled_trigger_script()
+            args = [compiled] if compiled else ["-e", _MAC_TRIGGER_SCRIPT]
             subprocess.run(
-                ["osascript", "-e", script],
+                ["osascript", *args],
                 capture_output=True,
                 timeout=10,
             )
@@ -89,6 +291,15 @@ class FLStudioTrigger:
             return False
 
     def _trigger_windows(self) -> bool:
+        """Trigger FL Studio on Windows, with one SendInput call if possible."""
+        try:
+            if _send_windows_keystroke():
+                return True
+        except Exception:
+            pass
+        return self._trigger_windows_pynput()
+
+    def _trigger_windows_pynput(self) -> bool:
         """Trigger FL Studio on Windows using pynput."""
         try:
             from pynput.keyboard import Controller, Key
@@ -107,11 +318,38 @@ class FLStudioTrigger:
         except Exception:
             return False
 
-    def trigger(self, delay: float = TRIGGER_DELAY) -> bool:
+    def _trigger_linux(self) -> bool:
+        """Trigger FL Studio on Linux (X11) with XTest fake key events."""
+        try:
+            disp = xdisplay.Display()
+        except Exception:
+            return False
+
+        try:
+            # Send Ctrl+Alt+Y (FL Studio under Wine keeps the Windows binding)
+            keycodes = [
+                disp.keysym_to_keycode(XK.string_to_keysym(name))
+                for name in ("Control_L", "Alt_L", "y")
+            ]
+            for keycode in keycodes:
+                xtest.fake_input(disp, X.KeyPress, keycode)
+            for keycode in reversed(keycodes):
+                xtest.fake_input(disp, X.KeyRelease, keycode)
+            disp.sync()
+            return True
+        except Exception:
+            return False
+        finally:
+            disp.close()
+
+    def trigger(self, delay: float = TRIGGER_DELAY, wait_for: Path | None = None) -> bool:
         """Trigger FL Studio to execute the Piano Roll script.
 
         Args:
             delay: Seconds to wait after triggering for FL Studio to process.
+            wait_for: Completion marker file the script rewrites when it
+                finishes. If given, the wait ends as soon as the marker
+                changes, and delay is only the upper bound.
 
         Returns:
             True if the trigger was sent successfully, False otherwise.
@@ -119,9 +357,13 @@ class FLStudioTrigger:
         if self._trigger_func is None:
             return False
 
+        before = _mtime_ns(wait_for) if wait_for is not None else None
         success = self._trigger_func()
         if success and delay > 0:
-            time.sleep(delay)
+            if wait_for is None:
+                time.sleep(delay)
+            else:
+                _wait_for_change(wait_for, before, delay)
 
         return success
 
@@ -138,11 +380,7 @@ class FLStudioTrigger:
     @property
     def keystroke(self) -> str:
         """Get the keystroke used for this platform."""
-        if self._system == "Darwin":
-            return "Cmd+Opt+Y"
-        elif self._system == "Windows":
-            return "Ctrl+Alt+Y"
-        return "Unknown"
+        return _KEYSTROKES.get(self._system, "Unknown")
 
 
 # Global trigger instance
@@ -157,13 +395,14 @@ def get_trigger() -> FLStudioTrigger:
     return _trigger
 
 
-def trigger_fl_studio(delay: float = TRIGGER_DELAY) -> bool:
+def trigger_fl_studio(delay: float = TRIGGER_DELAY, wait_for: Path | None = None) -> bool:
     """Convenience function to trigger FL Studio.
 
     Args:
-        delay: Seconds to wait after triggering.
+        delay: Seconds to wait after triggering (at most, with wait_for).
+        wait_for: Completion marker file; see FLStudioTrigger.trigger().
 
     Returns:
         True if successful, False otherwise.
     """
-    return get_trigger().trigger(delay)
+    return get_trigger().trigger(delay, wait_for)
@@ -9,31 +9,164 @@ The approach is:
 
 This is similar to how the piano_roll module works, but uses MIDI for triggering
 instead of keystrokes.
+
+When the FL Studio controller script has mapped mcp_shm.bin (it writes a magic
+header while loaded), commands and responses go through that shared memory
+region instead of the JSON files; the MIDI note is still the trigger. See the
+controller script for the layout.
 """
 
 from __future__ import annotations
 
+import atexit
+import functools
 import json
+import math
+import mmap
 import os
-import platform
+import struct
+import threading
 import time
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
+
+try:
+    import mido
+except ImportError:
+    mido = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from fl_studio_mcp.utils.fl_paths import get_fl_settings_dir
+
+# Shared memory layout (must match fl_controller/device_FLStudioMCP.py)
+SHM_FILENAME = "mcp_shm.bin"
+_SHM_MAGIC = b"FMCP"
+_SHM_SIZE = 1 << 18
+_SHM_CMD_OFFSET = 64
+_SHM_RESP_OFFSET = 1 << 17
+_SHM_SLOT_HEADER = struct.Struct("<II")  # seq, length
+_SHM_CMD_CAPACITY = _SHM_RESP_OFFSET - _SHM_CMD_OFFSET - _SHM_SLOT_HEADER.size
+_SHM_OVERFLOW = 0xFFFFFFFF
+
+# Response polling: start fast for quick commands, back off to the old 20ms
+# so slow commands don't cost more checks
+_POLL_INITIAL = 0.0005
+_POLL_BACKOFF = 1.5
+_POLL_MAX = 0.02
+
+# How long (seconds) get_status() reuses the MIDI output port list
+_PORT_LIST_TTL = 5.0
+
+# How often to look for the shared memory file again while it's missing
+_SHM_RETRY_INTERVAL = 5.0
+
+_JSON_BOOL = {True: b"true", False: b"false"}
+
+
+# Checks for the fixed-shape encoders below. A value they can't write exactly
+# raises, so the generic encoder handles (or rejects) it instead.
+def _finite(value: Any) -> float:
+    """Coerce to float for a %r template; NaN/inf raise so the generic encoder is used."""
+    value = float(value)
+    if not math.isfinite(value):
+        raise ValueError(value)
+    return value
+
+
+def _int(value: Any) -> int:
+    """Pass an int through for a %d template, which would truncate a float."""
+    if type(value) is not int:
+        raise TypeError(value)
+    return value
+
+
+def _bool(value: Any) -> bytes:
+    """Encode a bool as a JSON literal."""
+    if type(value) is not bool:
+        raise TypeError(value)
+    return _JSON_BOOL[value]
+
+
+# Fixed-shape encoders for the hottest commands: action -> (param names, encoder).
+# Used only when the params have exactly these keys; anything else goes
+# through the generic encoder.
+_ENCODERS: dict[str, tuple[frozenset[str], Callable[[dict[str, Any]], bytes]]] = {
+    "channels.setGridBit": (
+        frozenset(("channel", "position", "value")),
+        lambda p: b'{"action":"channels.setGridBit","params":'
+                  b'{"channel":%d,"position":%d,"value":%s}}'
+                  % (_int(p["channel"]), _int(p["position"]), _bool(p["value"])),
+    ),
+    "channels.triggerNote": (
+        frozenset(("channel", "note", "velocity", "midi_channel")),
+        lambda p: b'{"action":"channels.triggerNote","params":'
+                  b'{"channel":%d,"note":%d,"velocity":%d,"midi_channel":%d}}'
+                  % (_int(p["channel"]), _int(p["note"]), _int(p["velocity"]),
+                     _int(p["midi_channel"])),
+    ),
+    "mixer.setTrackVolume": (
+        frozenset(("track", "volume")),
+        lambda p: b'{"action":"mixer.setTrackVolume","params":{"track":%d,"volume":%r}}'
+                  % (_int(p["track"]), _finite(p["volume"])),
+    ),
+    "plugins.setParamValue": (
+        frozenset(("param_index", "value", "plugin_index", "slot_index", "use_global")),
+        lambda p: b'{"action":"plugins.setParamValue","params":{"param_index":%d,"value":%r,'
+                  b'"plugin_index":%d,"slot_index":%d,"use_global":%s}}'
+                  % (_int(p["param_index"]), _finite(p["value"]), _int(p["plugin_index"]),
+                     _int(p["slot_index"]), _bool(p["use_global"])),
+    ),
+}
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize to compact JSON bytes, with orjson when it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except orjson.JSONEncodeError:
+            # e.g. an integer wider than 64 bits, which the stdlib encoder allows
+            pass
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def _loads(data: bytes | str) -> Any:
+    """Parse JSON, with orjson when it is installed.
+
+    orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch the latter.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 
 
+@functools.lru_cache(maxsize=128)
+def _encode_no_params(action: str) -> bytes:
+    """Serialize a command without parameters (e.g. "transport.start"), once per action."""
+    return _dumps({"action": action, "params": {}})
+
+
+def _encode_command(action: str, params: dict[str, Any]) -> bytes:
+    """Serialize a command, using a fixed-shape encoder when one matches."""
+    if not params:
+        return _encode_no_params(action)
+    entry = _ENCODERS.get(action)
+    if entry is not None and params.keys() == entry[0]:
+        try:
+            return entry[1](params)
+        except (KeyError, TypeError, ValueError):
+            pass
+    return _dumps({"action": action, "params": params})
+
+
+@functools.cache
 def _get_fl_hardware_dir() -> Path:
-    """Get the FL Studio Hardware scripts directory."""
-    system = platform.system()
-
-    if system == "Darwin":
-        base = Path.home() / "Documents" / "Image-Line" / "FL Studio" / "Settings"
-    elif system == "Windows":
-        base = Path.home() / "Documents" / "Image-Line" / "FL Studio" / "Settings"
-    else:
-        # Linux fallback
-        base = Path.home() / ".fl-studio" / "Settings"
-
-    hardware_dir = base / "Hardware" / "FLStudioMCP"
+    """Get the FL Studio Hardware scripts directory (created on first use)."""
+    hardware_dir = get_fl_settings_dir() / "Hardware" / "FLStudioMCP"
     hardware_dir.mkdir(parents=True, exist_ok=True)
     return hardware_dir
 
@@ -42,8 +175,11 @@ class MIDIConnection:
     """MIDI-based connection to FL Studio.
 
     Communicates with FL Studio via:
-    - JSON files for command/response data
+    - A shared memory slot (or JSON files) for command/response data
     - MIDI trigger note to execute commands
+
+    The data doesn't travel as SysEx: replies would need a second virtual
+    MIDI port, routed back out of FL Studio, that users would have to set up.
     """
 
     # MIDI trigger note (same as in FL Studio controller script)
@@ -59,6 +195,35 @@ class MIDIConnection:
         self._hardware_dir = _get_fl_hardware_dir()
         self._command_file = self._hardware_dir / "mcp_command.json"
         self._response_file = self._hardware_dir / "mcp_response.json"
+        self._shm_file = self._hardware_dir / SHM_FILENAME
+
+        # Fixed part of get_status()
+        self._status_paths = {
+            "command_file": str(self._command_file),
+            "response_file": str(self._response_file),
+        }
+
+        # Command file descriptor, kept open and rewritten in place
+        self._command_fd: int | None = None
+
+        # Shared memory channel, attached when the controller script provides it
+        self._shm: mmap.mmap | None = None
+        self._shm_seq = 0
+        self._shm_checked = 0.0
+
+        # One command in flight at a time; file commands carry a request id
+        # that FL Studio echoes in the response. The controller skips a file
+        # command whose id it has already run, so ids start from the clock to
+        # stay unique across server restarts and reconnects.
+        self._lock = threading.Lock()
+        self._request_id = time.time_ns() // 1000
+
+        # Built once the port is open; reused for every command
+        self._trigger_msg = None
+
+        # Last MIDI output port list and when it was read
+        self._output_ports: list[str] = []
+        self._output_ports_read = -math.inf
 
     @property
     def is_connected(self) -> bool:
@@ -78,9 +243,7 @@ class MIDIConnection:
         if self._connected and self._port is not None:
             return True
 
-        try:
-            import mido
-        except ImportError:
+        if mido is None:
             self._error = (
                 "mido library not installed. Install with: pip install mido python-rtmidi"
             )
@@ -88,7 +251,7 @@ class MIDIConnection:
 
         # Find available MIDI output ports
         try:
-            output_ports = mido.get_output_names()
+            output_ports = self._get_output_ports(refresh=True)
         except Exception as e:
             self._error = f"Failed to get MIDI ports: {e}"
             return False
@@ -118,23 +281,88 @@ class MIDIConnection:
         try:
             self._port = mido.open_output(target_port)
             self._port_name = target_port
+            self._trigger_msg = mido.Message("note_on", note=self.TRIGGER_NOTE, velocity=127)
             self._connected = True
             self._error = None
+            self._attach_shared_memory()
             return True
         except Exception as e:
             self._error = f"Failed to open MIDI port '{target_port}': {e}"
             return False
 
+    def _get_output_ports(self, refresh: bool = False) -> list[str]:
+        """List MIDI output ports, reusing the last list for _PORT_LIST_TTL seconds.
+
+        Raises whatever mido raises when the backend can't enumerate ports.
+        """
+        if mido is None:
+            return []
+        now = time.monotonic()
+        if refresh or now - self._output_ports_read > _PORT_LIST_TTL:
+            self._output_ports = mido.get_output_names()
+            self._output_ports_read = now
+        return self._output_ports
+
     def disconnect(self) -> None:
-        """Close the MIDI connection."""
-        if self._port is not None:
+        """Close the MIDI connection, once any command in flight has finished."""
+        with self._lock:
+            if self._port is not None:
+                try:
+                    self._port.close()
+                except Exception:
+                    pass
+                self._port = None
+            if self._shm is not None:
+                self._shm.close()
+                self._shm = None
+            self._close_command_file()
+            self._connected = False
+            self._port_name = None
+
+    def _write_command_file(self, data: bytes) -> None:
+        """Replace the command file's contents, reusing one open descriptor."""
+        if self._command_fd is None:
+            flags = os.O_WRONLY | os.O_CREAT | getattr(os, "O_BINARY", 0)
+            self._command_fd = os.open(self._command_file, flags, 0o644)
+        fd = self._command_fd
+        try:
+            os.ftruncate(fd, 0)
+            os.lseek(fd, 0, os.SEEK_SET)
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        except OSError:
+            # Reopen next time, in case the file was deleted or the fd went bad
+            self._close_command_file()
+            raise
+
+    def _close_command_file(self) -> None:
+        if self._command_fd is not None:
             try:
-                self._port.close()
-            except Exception:
+                os.close(self._command_fd)
+            except OSError:
                 pass
-            self._port = None
-        self._connected = False
-        self._port_name = None
+            self._command_fd = None
+
+    def _attach_shared_memory(self) -> bool:
+        """Map the controller script's shared memory file if it is present and live."""
+        self._shm_checked = time.monotonic()
+        try:
+            with open(self._shm_file, "r+b") as f:
+                if os.fstat(f.fileno()).st_size < _SHM_SIZE:
+                    return False
+                shm = mmap.mmap(f.fileno(), _SHM_SIZE)
+        except (OSError, ValueError):
+            return False
+
+        if shm[:4] != _SHM_MAGIC:
+            shm.close()
+            return False
+
+        # Continue from the slot's current seq so the script sees a new command
+        self._shm_seq = _SHM_SLOT_HEADER.unpack_from(shm, _SHM_CMD_OFFSET)[0]
+        self._shm = shm
+        return True
 
     def ensure_connected(self) -> None:
         """Ensure connection to FL Studio is active. Raises RuntimeError if not."""
@@ -163,70 +391,209 @@ class MIDIConnection:
         Raises:
             RuntimeError: If not connected or command fails
         """
-        self.ensure_connected()
-
-        # Prepare command
-        command = {
-            "action": action,
-            "params": params or {},
-        }
-
-        # Write command to file
+        payload = _encode_command(action, params or {})
+        with self._lock:
+            # Checked under the lock, so a concurrent disconnect() can't close
+            # the port or shared memory between the check and the send
+            self.ensure_connected()
+            return self._send_payload(payload, timeout)
+
+    def _send_payload(self, payload: bytes, timeout: float) -> dict[str, Any]:
+        """Deliver an encoded command and wait for its response. Caller holds _lock."""
+        if self._shm is not None and self._shm[:4] != _SHM_MAGIC:
+            # The controller script was unloaded; fall back to the JSON files
+            self._shm.close()
+            self._shm = None
+        if self._shm is None and time.monotonic() - self._shm_checked > _SHM_RETRY_INTERVAL:
+            self._attach_shared_memory()
+
+        if self._shm is not None and len(payload) <= _SHM_CMD_CAPACITY:
+            return self._send_shared_memory(payload, timeout)
+
+        # Write command to file, tagged with a fresh request id
+        self._request_id += 1
+        request_id = self._request_id
         try:
-            self._command_file.write_text(json.dumps(command, indent=2))
+            self._write_command_file(b'{"id":%d,' % request_id + payload[1:])
         except Exception as e:
             return {"success": False, "error": f"Failed to write command file: {e}"}
 
         # Clear old response file
-        if self._response_file.exists():
+        try:
+            self._response_file.unlink()
+        except OSError:
+            pass
+
+        error = self._send_trigger()
+        if error is not None:
+            return error
+
+        # Wait for response
+        return self._wait_for_response(timeout, request_id)
+
+    def send_batch(
+        self,
+        commands: list[tuple[str, dict[str, Any] | None]],
+        timeout: float = 5.0,
+        linked: bool = False,
+    ) -> list[dict[str, Any]]:
+        """Send several commands to FL Studio in a single round-trip.
+
+        FL Studio executes the commands in order and replies with one result
+        per command.
+
+        Args:
+            commands: List of (action, params) pairs
+            timeout: Maximum time to wait for the whole batch in seconds
+            linked: Stop at the first failing command; later ones are skipped
+
+        Returns:
+            One response dictionary per command, in order
+        """
+        response = self.send_command("batch", {
+            "commands": [
+                {"action": action, "params": params or {}} for action, params in commands
+            ],
+            "linked": linked,
+        }, timeout)
+
+        results = response.get("results")
+        if not response.get("success", False) or results is None:
+            error = response.get("error", "Batch command failed")
+            return [{"success": False, "error": error} for _ in commands]
+
+        return results
+
+    def send_raw_midi(self, status: int, data1: int, data2: int) -> dict[str, Any] | None:
+        """Send a 3-byte MIDI message straight to FL Studio, without a response.
+
+        Returns an error dict on failure, None on success.
+
+        Raises:
+            RuntimeError: If not connected
+        """
+        with self._lock:
+            self.ensure_connected()
             try:
-                self._response_file.unlink()
-            except Exception:
-                pass
+                self._port.send(mido.Message.from_bytes([status, data1, data2]))
+            except Exception as e:
+                return {"success": False, "error": f"Failed to send MIDI message: {e}"}
+        return None
 
-        # Send MIDI trigger
+    def _send_trigger(self) -> dict[str, Any] | None:
+        """Send the MIDI trigger note. Returns an error dict on failure."""
         try:
-            import mido
-            trigger_msg = mido.Message("note_on", note=self.TRIGGER_NOTE, velocity=127)
-            self._port.send(trigger_msg)
+            self._port.send(self._trigger_msg)
         except Exception as e:
             return {"success": False, "error": f"Failed to send MIDI trigger: {e}"}
+        return None
 
-        # Wait for response
-        return self._wait_for_response(timeout)
+    def _send_shared_memory(self, payload: bytes, timeout: float) -> dict[str, Any]:
+        """Send a command through the shared memory slot and wait for its response."""
+        shm = self._shm
+        seq = (self._shm_seq + 1) & 0xFFFFFFFF
+        self._shm_seq = seq
+
+        start = _SHM_CMD_OFFSET + _SHM_SLOT_HEADER.size
+        shm[start:start + len(payload)] = payload
+        _SHM_SLOT_HEADER.pack_into(shm, _SHM_CMD_OFFSET, seq, len(payload))
+
+        error = self._send_trigger()
+        if error is not None:
+            return error
+
+        start_time = time.time()
+        poll_interval = _POLL_INITIAL
+
+        while time.time() - start_time < timeout:
+            resp_seq, length = _SHM_SLOT_HEADER.unpack_from(shm, _SHM_RESP_OFFSET)
+            if resp_seq == seq:
+                if length == _SHM_OVERFLOW:
+                    # Oversized response: the script wrote the response file
+                    # before publishing the seq, so it is already complete
+                    return self._read_response_file()
+                data_start = _SHM_RESP_OFFSET + _SHM_SLOT_HEADER.size
+                try:
+                    return _loads(shm[data_start:data_start + length])
+                except json.JSONDecodeError as e:
+                    return {"success": False, "error": f"Invalid JSON in response: {e}"}
+
+            time.sleep(poll_interval)
+            poll_interval = min(poll_interval * _POLL_BACKOFF, _POLL_MAX)
 
-    def _wait_for_response(self, timeout: float) -> dict[str, Any]:
+        return self._timeout_error(timeout)
+
+    def _read_response_file(self) -> dict[str, Any]:
+        """Read and remove the response file written for an oversized response."""
+        try:
+            data = self._response_file.read_bytes()
+        except OSError as e:
+            return {"success": False, "error": f"Failed to read response: {e}"}
+
+        try:
+            self._response_file.unlink()
+        except OSError:
+            pass
+
+        try:
+            return _loads(data)
+        except json.JSONDecodeError as e:
+            return {"success": False, "error": f"Invalid JSON in response: {e}"}
+
+    def _wait_for_response(self, timeout: float, request_id: int) -> dict[str, Any]:
         """Wait for response file to appear and read it.
 
+        This is the fallback for controller scripts without shared memory, so
+        it polls (with backoff) rather than depending on a per-platform file
+        watcher or on io_uring (Linux-only, where FL Studio doesn't run).
+
         Args:
             timeout: Maximum time to wait in seconds
+            request_id: Id the command was sent with. A response carrying a
+                different id is a late reply to an earlier command and is
+                discarded. Responses without an id (older controller
+                scripts) are accepted.
 
         Returns:
             Response dictionary or error dict if timeout
         """
         start_time = time.time()
-        poll_interval = 0.02  # 20ms between checks
+        poll_interval = _POLL_INITIAL
+        decode_error: json.JSONDecodeError | None = None
 
         while time.time() - start_time < timeout:
-            if self._response_file.exists():
+            # Reading straight away replaces a separate exists() check
+            try:
+                data = self._response_file.read_bytes()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                return {"success": False, "error": f"Failed to read response: {e}"}
+            else:
                 try:
-                    response_text = self._response_file.read_text()
-                    response = json.loads(response_text)
-
+                    response = _loads(data)
+                except json.JSONDecodeError as e:
+                    # Probably caught mid-write; read it again on the next poll
+                    decode_error = e
+                else:
                     # Clean up response file
                     try:
                         self._response_file.unlink()
-                    except Exception:
+                    except OSError:
                         pass
-
-                    return response
-                except json.JSONDecodeError as e:
-                    return {"success": False, "error": f"Invalid JSON in response: {e}"}
-                except Exception as e:
-                    return {"success": False, "error": f"Failed to read response: {e}"}
+                    if response.pop("id", request_id) == request_id:
+                        return response
 
             time.sleep(poll_interval)
+            poll_interval = min(poll_interval * _POLL_BACKOFF, _POLL_MAX)
 
+        if decode_error is not None:
+            return {"success": False, "error": f"Invalid JSON in response: {decode_error}"}
+        return self._timeout_error(timeout)
+
+    @staticmethod
+    def _timeout_error(timeout: float) -> dict[str, Any]:
+        """Build the error response for a command that got no reply."""
         return {
             "success": False,
             "error": (
@@ -237,11 +604,13 @@ class MIDIConnection:
         }
 
     def get_status(self) -> dict[str, Any]:
-        """Get connection status information."""
-        import mido
+        """Get connection status information.
 
+        The port list is reused for _PORT_LIST_TTL seconds (connect() always
+        re-enumerates), so frequent status polling doesn't walk the MIDI system.
+        """
         try:
-            output_ports = mido.get_output_names()
+            output_ports = self._get_output_ports()
         except Exception:
             output_ports = []
 
@@ -249,8 +618,8 @@ class MIDIConnection:
             "connected": self.is_connected,
             "port_name": self._port_name,
             "available_ports": output_ports,
-            "command_file": str(self._command_file),
-            "response_file": str(self._response_file),
+            "transport": "shared_memory" if self._shm is not None else "files",
+            **self._status_paths,
             "error": self._error,
         }
 
@@ -273,3 +642,10 @@ def reset_connection() -> None:
     if _connection is not None:
         _connection.disconnect()
         _connection = None
+
+
+@atexit.register
+def _disconnect_at_exit() -> None:
+    """Close the MIDI port and shared memory map when the server exits."""
+    if _connection is not None:
+        _connection.disconnect()